@@ -1,11 +1,23 @@
 import streamlit as st
-import requests
-from bs4 import BeautifulSoup
 import pandas as pd
-import re
-import seaborn as sns
-import matplotlib.pyplot as plt
 from streamlit_option_menu import option_menu
+from parsers import available_backends
+from jobs import get_runner
+from cleaning import run_pipeline, list_frame
+from viewer import show_frame
+from export import FORMATS
+from downloads import download_frame, download_all
+from linkgraph import domain_frequency
+from tracing import Trace, span, tracing
+from trace_panel import show_trace
+from results import get_result_store
+
+IMAGES_PER_PAGE = 24
+GRID_COLUMNS = 6
+# Assets checked between progress updates of a background check.
+PROBE_BATCH = 48
+# Scrapes whose headlines the analysis page can count together.
+MAX_HEADLINE_HISTORY = 20
 
 st.set_page_config(page_title="Web Scraper, Data Cleaner, and Data Analysis", layout="wide")
 
@@ -17,164 +29,274 @@ with st.sidebar:
         menu_icon="cast",
         default_index=0,
     )
-
-def get_all_links(url):
-    """Get all links from the given URL."""
-    response = requests.get(url)
-    soup = BeautifulSoup(response.text, 'html.parser')
-    links = set()
-    for a_tag in soup.find_all('a', href=True):
-        link = re.sub(r'^(?!http)', f'{url.rstrip("/")}/', a_tag['href'])
-        if link.startswith("http"):
-            links.add(link)
-    return links
-
-def scrape_page(url):
-    """Scrape the content of the given URL."""
-    response = requests.get(url)
-    soup = BeautifulSoup(response.text, 'html.parser')
-    return soup
-
-def scrape_data(url, scrape_headlines, selected_headlines_tags, scrape_links, scrape_images, scrape_media, table_indices):
-    soup = scrape_page(url)
-    
-    tables = soup.find_all("table")
-    all_table_data = []
-    if tables:
-        for i, table in enumerate(tables, 1):
-            if table_indices and i not in table_indices:
-                continue
-            st.write(f"Scraping Table {i}...")
-            rows = table.find_all("tr")
-            if rows:
-                headers = [th.text.strip() for th in rows[0].find_all("th")]
-                if not headers:
-                    headers = [f"Column {j+1}" for j in range(len(rows[0].find_all("td")))]
-
-                data = []
-                for row in rows[1:]:
-                    cols = row.find_all(["th", "td"])
-                    cols = [col.text.strip() for col in cols]
-                    
-                    while len(cols) < len(headers):
-                        cols.append("")  
-                    if len(cols) > len(headers):
-                        cols = cols[:len(headers)]  
-                    data.append(cols)
-
-                df = pd.DataFrame(data, columns=headers)
-                all_table_data.append(df)
+    show_performance = st.toggle("Performance panel", help="Time and bytes per stage of the current scrape and of showing its results.")
+
+# Parts of a scrape result, in the order run_scrape returns them.
+RESULT_PARTS = ["table_data", "headlines", "links", "images", "media_files", "metadata", "error"]
+
+def store_scrape(job, *args, **kwargs):
+    """Run a scrape and keep its result in the shared result store; the job's result is the handle."""
+    # Imported on first use so the other pages start without the fetch stack.
+    from scraper import run_scrape
+
+    parts = dict(zip(RESULT_PARTS, run_scrape(job, *args, **kwargs)))
+    parts["link_graph"] = job.artifacts.pop("link_graph", None)
+    # Kept with the result, which can outlive the job.
+    parts["warnings"] = [message for level, message in job.messages if level == "warning"]
+    return get_result_store().put(parts)
+
+def scraped(part):
+    """Return a part of this session's scrape result, or None."""
+    result = get_result_store().get(st.session_state.get('result'))
+    return result.get(part) if result else None
+
+def start_scraping(url, scrape_headlines, selected_headlines_tags, scrape_links, scrape_images, scrape_media, table_indices, crawl_pages=False, max_depth=1, max_pages=50, parser=None, mode="auto", incremental=False, discover_pages=False):
+    with span("start_scraping", url=url):
+        job = get_runner().submit(
+            store_scrape, url, scrape_headlines, selected_headlines_tags, scrape_links, scrape_images, scrape_media, table_indices,
+            crawl_pages, max_depth, max_pages, parser, mode, incremental, discover_pages=discover_pages, description=url,
+        )
+    st.session_state['scrape_job'] = job.id
+
+@st.fragment(run_every=1)
+def show_job_progress(job):
+    """Poll a running job and rerun the page once it has finished."""
+    if job.finished:
+        st.rerun()
+    pages = job.progress.get("pages", 0)
+    tables = job.progress.get("tables", 0)
+    max_pages = job.progress.get("max_pages")
+    if max_pages:
+        st.progress(min(pages / max_pages, 1.0), text=f"Fetched {pages} page(s), parsed {tables} table(s)")
+    else:
+        st.write(f"Fetched {pages} page(s), parsed {tables} table(s)")
+    for level, message in job.messages[-5:]:
+        st.caption(message)
+    if st.button("Cancel scraping", key=f"cancel_{job.id}"):
+        job.cancel()
+
+def show_scrape_job():
+    """Show progress of this session's scrape job, or its results once finished."""
+    job = get_runner().get(st.session_state.get('scrape_job'))
+    if job is None:
+        # Finished jobs are pruned across all sessions; the session's result handle outlives them.
+        if st.session_state.get('result'):
+            result = get_result_store().get(st.session_state['result'])
+            if result is None:
+                st.warning("These results are no longer kept; scrape the page again.")
+            else:
+                for message in result.get("warnings", []):
+                    st.warning(message)
+                show_results(None, *[result[part] for part in RESULT_PARTS])
+        return
+    if not job.finished:
+        with st.spinner("Scraping in progress..."):
+            show_job_progress(job)
+        return
+    for level, message in job.messages:
+        if level == "warning":
+            st.warning(message)
+    if job.error:
+        st.error(job.error)
+    elif job.result is not None:
+        result = get_result_store().get(job.result)
+        if result is None:
+            st.warning("These results are no longer kept; scrape the page again.")
+        else:
+            show_results(job, *[result[part] for part in RESULT_PARTS])
+    elif job.status == "cancelled":
+        st.info("Scraping was cancelled.")
+
+def describe_asset(info):
+    if not info.ok:
+        return f"broken ({info.status})" if info.status else "unreachable"
+    parts = []
+    if info.width:
+        parts.append(f"{info.width}×{info.height}")
+    if info.size is not None:
+        parts.append(f"{info.size / 1024:.0f} KB")
+    if info.content_type:
+        parts.append(info.content_type)
+    return ", ".join(parts)
+
+def load_previews(job, urls):
+    """Make thumbnails and probe a page of images on a background worker; the results land in the assets caches."""
+    from assets import probe_all, thumbnails
+
+    thumbnails(urls)
+    job.check_cancelled()
+    # Most probes are answered by the thumbnail downloads already.
+    probe_all(urls)
+
+@st.fragment(run_every=1)
+def show_preview_progress(job, missing):
+    """Poll a running preview job and rerun the page once it has finished."""
+    if job.finished:
+        st.rerun()
+    st.caption(f"Loading {missing} image preview(s)...")
+
+def show_image_grid(urls, key):
+    """Show images a page at a time as thumbnails rendered on the server.
+
+    Previews not cached yet are made by a background job, and the grid is
+    shown again once it has finished.
+    """
+    # Imported on first use so the other pages start without the fetch stack.
+    from assets import cached_previews
+
+    pages = (len(urls) - 1) // IMAGES_PER_PAGE + 1
+    page = 1
+    if pages > 1:
+        page = st.number_input(f"Image page (of {pages}):", min_value=1, max_value=pages, value=1, key=f"{key}_page")
+    batch = urls[(page - 1) * IMAGES_PER_PAGE:page * IMAGES_PER_PAGE]
+    with span("render.thumbnails", images=len(batch)) as attributes:
+        previews = cached_previews(batch)
+        missing = [img_url for img_url, (preview, info) in zip(batch, previews) if preview is None or info is None]
+        attributes["bytes"] = sum(len(preview) for preview, _ in previews if preview)
+        attributes["missing"] = len(missing)
+    if missing:
+        # One job per page of images; it is not restarted for previews that could not be cached.
+        job_key = f"{key}_previews_{hash(tuple(batch))}"
+        job = get_runner().get(st.session_state.get(job_key))
+        if job is None:
+            job = get_runner().submit(load_previews, missing, description=f"Loading {len(missing)} image previews")
+            st.session_state[job_key] = job.id
+        if not job.finished:
+            show_preview_progress(job, len(missing))
+    for start in range(0, len(batch), GRID_COLUMNS):
+        row = zip(st.columns(GRID_COLUMNS), batch[start:], previews[start:])
+        for column, img_url, (preview, info) in row:
+            with column:
+                if preview:
+                    st.image(preview)
+                name = f"[{img_url.rsplit('/', 1)[-1][:40] or img_url}]({img_url})"
+                st.caption(f"{name} · {describe_asset(info)}" if info else name)
+
+def probe_assets(job, urls):
+    """Probe URLs on a background worker, a batch at a time so progress and cancelling show."""
+    from assets import probe_all
+
+    infos = []
+    for start in range(0, len(urls), PROBE_BATCH):
+        job.check_cancelled()
+        infos += probe_all(urls[start:start + PROBE_BATCH])
+        job.advance("assets", len(urls[start:start + PROBE_BATCH]))
+    return infos
+
+@st.fragment(run_every=1)
+def show_probe_progress(job, total, label):
+    """Poll a running asset check and rerun the page once it has finished."""
+    if job.finished:
+        st.rerun()
+    checked = job.progress.get("assets", 0)
+    st.progress(min(checked / total, 1.0), text=f"Checked {checked} of {total} {label}")
+    if st.button("Cancel checking", key=f"cancel_{job.id}"):
+        job.cancel()
+
+def show_asset_report(urls, key, label):
+    """Check every URL in the background on request and list status, type, size and dimensions."""
+    key = f"{key}_{hash(tuple(urls))}"
+    job = get_runner().get(st.session_state.get(key))
+    if job is None:
+        if not st.button(f"Check all {len(urls)} {label}", key=f"check_{key}"):
+            return
+        job = get_runner().submit(probe_assets, list(urls), description=f"Checking {len(urls)} {label}")
+        st.session_state[key] = job.id
+    if not job.finished:
+        show_probe_progress(job, len(urls), label)
+        return
+    if job.error:
+        st.error(job.error)
+        return
+    if job.result is None:
+        st.info("Checking was cancelled.")
+        return
+
+    from assets import AssetInfo
+
+    report = pd.DataFrame(job.result, columns=AssetInfo._fields)
+    broken = int((~report["ok"]).sum())
+    st.caption(f"{len(report) - broken} reachable, {broken} broken, {report['size'].sum() / 1e6:.1f} MB in total")
+    show_frame(report, f"{key}_report")
+
+def show_results(job, table_data, headlines, links, images, media_files, metadata, error):
+    if error:
+        st.error(error)
     else:
-        st.warning("No tables found on this page.")
-
-    headlines = []
-    if scrape_headlines:
-        if selected_headlines_tags:
-            for tag in selected_headlines_tags:
-                headline_tags = soup.find_all(tag)
-                headlines += [tag.text.strip() for tag in headline_tags]
-
-    links = []
-    if scrape_links:
-        anchor_tags = soup.find_all("a", href=True)
-        links = [a['href'] for a in anchor_tags if a['href'].startswith("http")]
-
-    images = []
-    if scrape_images:
-        img_tags = soup.find_all("img")
-        images = [img['src'] for img in img_tags if 'src' in img.attrs]
-
-    media_files = []
-    if scrape_media:
-        media_tags = soup.find_all(["audio", "video", "source"])
-        media_files = [media['src'] for media in media_tags if 'src' in media.attrs]
-
-    metadata = {
-        "title": soup.title.string if soup.title else "No title",
-        "description": soup.find("meta", {"name": "description"})["content"] if soup.find("meta", {"name": "description"}) else "No description",
-        "keywords": soup.find("meta", {"name": "keywords"})["content"] if soup.find("meta", {"name": "keywords"}) else "No keywords"
-    }
-
-    return all_table_data, headlines, links, images, media_files, metadata, None
-
-def start_scraping(url, scrape_headlines, selected_headlines_tags, scrape_links, scrape_images, scrape_media, table_indices):
-    with st.spinner("Scraping in progress..."):
-        table_data, headlines, links, images, media_files, metadata, error = scrape_data(url, scrape_headlines, selected_headlines_tags, scrape_links, scrape_images, scrape_media, table_indices)
-        if error:
-            st.error(error)
+        if job is not None and job.status == "cancelled":
+            st.info("Scraping was cancelled.")
         else:
             st.success("Data scraped")
+        if job is not None and ("unchanged_pages" in job.progress or "unchanged_tables" in job.progress):
+            st.info(
+                f"Skipped {job.progress.get('unchanged_pages', 0)} unchanged page(s) and "
+                f"{job.progress.get('unchanged_tables', 0)} unchanged table(s); tables below list only changed rows."
+            )
+
+        # The session keeps only a handle; the result lives in the shared store.
+        if job is not None and st.session_state.get('result') != job.result:
+            if st.session_state.get('result'):
+                get_result_store().discard(st.session_state['result'])
+            st.session_state['result'] = job.result
+            if headlines:
+                # Headlines outlive their result so word counts can span this session's scrapes.
+                history = st.session_state.setdefault('headline_history', [])
+                history.append(get_result_store().put({"headlines": headlines}))
+                for handle in history[:-MAX_HEADLINE_HISTORY]:
+                    get_result_store().discard(handle)
+                del history[:-MAX_HEADLINE_HISTORY]
 
-            st.session_state['table_data'] = table_data
-            st.session_state['headlines'] = headlines
-            st.session_state['links'] = links
-            st.session_state['images'] = images
-            st.session_state['media_files'] = media_files
-            st.session_state['metadata'] = metadata
+        fmt = st.selectbox("Download format:", list(FORMATS), key="scrape_export_format")
+        artifacts = []
 
+        if metadata:
             st.write("### Metadata:")
             st.json(metadata)
+            artifacts.append(("metadata", pd.DataFrame([metadata])))
 
+        with span("render.tables", tables=len(table_data)):
             for i, df in enumerate(table_data, 1):
                 st.write(f"### Table {i}:")
-                st.dataframe(df)
-                csv = df.to_csv(index=False)
-                st.download_button(
-                    label=f"Download Table {i} CSV",
-                    data=csv,
-                    file_name=f"table_{i}.csv",
-                    mime="text/csv",
-                )
+                show_frame(df, f"scrape_table_{i}")
+                download_frame(f"Table {i}", df, f"table_{i}", fmt)
+                artifacts.append((f"table_{i}", df))
 
-            if headlines:
+        if headlines:
+            with span("render.headlines", rows=len(headlines)):
                 st.write("### Headlines Found:")
-                headlines_df = pd.DataFrame(headlines, columns=["Headlines"])
-                st.dataframe(headlines_df)
-                csv_headlines = headlines_df.to_csv(index=False)
-                st.download_button(
-                    label="Download Headlines CSV",
-                    data=csv_headlines,
-                    file_name="scraped_headlines.csv",
-                    mime="text/csv",
-                )
-
-            if links:
+                headlines_df = list_frame(headlines, "Headlines")
+                show_frame(headlines_df, "scrape_headlines")
+                download_frame("Headlines", headlines_df, "scraped_headlines", fmt)
+                artifacts.append(("scraped_headlines", headlines_df))
+
+        if links:
+            with span("render.links", rows=len(links)):
                 st.write("### Links Found:")
-                links_df = pd.DataFrame(links, columns=["Links"])
-                st.dataframe(links_df)
-                csv_links = links_df.to_csv(index=False)
-                st.download_button(
-                    label="Download Links CSV", 
-                    data=csv_links,
-                    file_name="scraped_links.csv",
-                    mime="text/csv",
-                )
-
-            if images:
+                links_df = list_frame(links, "Links")
+                show_frame(links_df, "scrape_links")
+                download_frame("Links", links_df, "scraped_links", fmt)
+                artifacts.append(("scraped_links", links_df))
+
+        if images:
+            with span("render.images", rows=len(images)):
                 st.write("### Images Found:")
-                images_df = pd.DataFrame(images, columns=["Image URLs"])
-                st.dataframe(images_df)
-                csv_images = images_df.to_csv(index=False)
-                st.download_button(
-                    label="Download Images CSV",
-                    data=csv_images,
-                    file_name="scraped_images.csv",
-                    mime="text/csv",
-                )
-                for img_url in images:
-                    st.image(img_url, caption=img_url)
-
-            if media_files:
+                images_df = list_frame(images, "Image URLs")
+                show_frame(images_df, "scrape_images")
+                download_frame("Images", images_df, "scraped_images", fmt)
+                artifacts.append(("scraped_images", images_df))
+                show_asset_report(images, "scrape_images", "images")
+                show_image_grid(images, "scrape_images")
+
+        if media_files:
+            with span("render.media", rows=len(media_files)):
                 st.write("### Media Files Found:")
-                media_files_df = pd.DataFrame(media_files, columns=["Media URLs"])
-                st.dataframe(media_files_df)
-                csv_media_files = media_files_df.to_csv(index=False)
-                st.download_button(
-                    label="Download Media Files CSV",
-                    data=csv_media_files,
-                    file_name="scraped_media_files.csv",
-                    mime="text/csv",
-                )
+                media_files_df = list_frame(media_files, "Media URLs")
+                show_frame(media_files_df, "scrape_media")
+                download_frame("Media Files", media_files_df, "scraped_media_files", fmt)
+                artifacts.append(("scraped_media_files", media_files_df))
+                show_asset_report(media_files, "scrape_media", "media files")
+
+        download_all(artifacts, fmt, "scraped_data")
 
 def data_cleaning():
     st.title("Data Cleaning")
@@ -184,88 +306,70 @@ def data_cleaning():
         Select the cleaning options below.
     """)
 
-    if 'table_data' in st.session_state and st.session_state['table_data']:
-        for i, df in enumerate(st.session_state['table_data'], 1):
-            st.write(f"### Table {i}:")
-            st.dataframe(df)
+    fmt = st.selectbox("Download format:", list(FORMATS), key="cleaning_export_format")
+    artifacts = []
 
+    if scraped('table_data'):
+        for i, df in enumerate(scraped('table_data'), 1):
+            st.write(f"### Table {i}:")
+            steps = []
             if st.checkbox(f"Remove duplicates from Table {i}"):
-                df = df.drop_duplicates()
-                st.write(f"### Table {i} after removing duplicates")
-                st.dataframe(df)
-
+                steps.append("drop_duplicates")
             if st.checkbox(f"Drop missing values from Table {i}"):
-                df = df.dropna()
-                st.write(f"### Table {i} after dropping missing values")
-                st.dataframe(df)
-
+                steps.append("dropna")
             if st.checkbox(f"Normalize text in Table {i} (lowercase)"):
-                df = df.applymap(lambda x: x.lower() if isinstance(x, str) else x)
-                st.write(f"### Table {i} after normalizing text")
-                st.dataframe(df)
-
-            csv_cleaned = df.to_csv(index=False)
-            st.download_button(
-                label=f"Download Cleaned Table {i} CSV",
-                data=csv_cleaned,
-                file_name=f"cleaned_table_{i}.csv",
-                mime="text/csv",
-            )
+                steps.append("lowercase")
 
-    if 'headlines' in st.session_state and st.session_state['headlines']:
-        st.write("### Headlines Found:")
-        headlines_df = pd.DataFrame(st.session_state['headlines'], columns=["Headlines"])
-        st.dataframe(headlines_df)
+            cleaned = run_pipeline(df, steps)
+            if steps:
+                st.caption(f"{len(df)} rows before cleaning, {len(cleaned)} after")
+            show_frame(cleaned, f"cleaning_table_{i}")
+            df = cleaned
 
-        if st.checkbox("Remove duplicates from Headlines"):
-            headlines_df = headlines_df.drop_duplicates()
-            st.write("### Headlines after removing duplicates")
-            st.dataframe(headlines_df)
+            download_frame(f"Cleaned Table {i}", df, f"cleaned_table_{i}", fmt)
+            artifacts.append((f"cleaned_table_{i}", df))
 
+    if scraped('headlines'):
+        st.write("### Headlines Found:")
+        headlines_df = list_frame(scraped('headlines'), "Headlines")
+        steps = []
+        if st.checkbox("Remove duplicates from Headlines"):
+            steps.append("drop_duplicates")
         if st.checkbox("Normalize text in Headlines (convert to lowercase)"):
-            headlines_df = headlines_df.applymap(lambda x: x.lower() if isinstance(x, str) else x)
-            st.write("### Headlines after normalizing text")
-            st.dataframe(headlines_df)
-
-        csv_cleaned_headlines = headlines_df.to_csv(index=False)
-        st.download_button(
-            label="Download Cleaned Headlines CSV",
-            data=csv_cleaned_headlines,
-            file_name="cleaned_headlines.csv",
-            mime="text/csv",
-        )
+            steps.append("lowercase")
+        headlines_df = run_pipeline(headlines_df, steps)
+        show_frame(headlines_df, "cleaning_headlines")
 
-    if 'links' in st.session_state and st.session_state['links']:
+        download_frame("Cleaned Headlines", headlines_df, "cleaned_headlines", fmt)
+        artifacts.append(("cleaned_headlines", headlines_df))
+
+    if scraped('links'):
         st.write("### Links Found:")
-        links_df = pd.DataFrame(st.session_state['links'], columns=["Links"])
-        st.dataframe(links_df)
-
-        if st.checkbox("Remove duplicates from Links"):
-            links_df = links_df.drop_duplicates()
-            st.write("### Links after removing duplicates")
-            st.dataframe(links_df)
-
-        csv_cleaned_links = links_df.to_csv(index=False)
-        st.download_button(
-            label="Download Cleaned Links CSV",
-            data=csv_cleaned_links,
-            file_name="cleaned_links.csv",
-            mime="text/csv",
-        )
+        links_df = list_frame(scraped('links'), "Links")
+        steps = ["drop_duplicates"] if st.checkbox("Remove duplicates from Links") else []
+        links_df = run_pipeline(links_df, steps)
+        show_frame(links_df, "cleaning_links")
 
-    if 'images' in st.session_state and st.session_state['images']:
+        download_frame("Cleaned Links", links_df, "cleaned_links", fmt)
+        artifacts.append(("cleaned_links", links_df))
+
+    if scraped('images'):
         st.write("### Images Found:")
-        images_df = pd.DataFrame(st.session_state['images'], columns=["Image URLs"])
-        st.dataframe(images_df)
-        for img_url in st.session_state['images']:
-            st.image(img_url, caption=img_url)
+        images_df = list_frame(scraped('images'), "Image URLs")
+        show_frame(images_df, "cleaning_images")
+        show_image_grid(scraped('images'), "cleaning_images")
 
-    if 'media_files' in st.session_state and st.session_state['media_files']:
+    if scraped('media_files'):
         st.write("### Media Files Found:")
-        media_files_df = pd.DataFrame(st.session_state['media_files'], columns=["Media URLs"])
-        st.dataframe(media_files_df)
+        media_files_df = list_frame(scraped('media_files'), "Media URLs")
+        show_frame(media_files_df, "cleaning_media")
+
+    download_all(artifacts, fmt, "cleaned_data")
 
 def data_analysis():
+    # Plotting libraries are only loaded once this page is opened.
+    from analysis import numeric_frame, heatmap_png, pairplot_png, histplot_png, top_columns, term_frequency, combined_term_frequency, MAX_PLOT_ROWS
+
     st.title("Data Analysis")
     st.markdown("""
         This page allows you to perform deeper analysis on the scraped data using Seaborn.
@@ -274,73 +378,99 @@ def data_analysis():
 
     data_type = st.selectbox("Select data type to analyze", ["Tables", "Headlines", "Links", "Images", "Media Files"])
 
-    if data_type == "Tables" and 'table_data' in st.session_state and st.session_state['table_data']:
-        table_indices = list(range(1, len(st.session_state['table_data']) + 1))
+    if data_type == "Tables" and scraped('table_data'):
+        table_indices = list(range(1, len(scraped('table_data')) + 1))
         selected_table_index = st.selectbox("Select table to analyze", table_indices)
-        df = st.session_state['table_data'][selected_table_index - 1]
+        df = scraped('table_data')[selected_table_index - 1]
 
         st.write(f"### Table {selected_table_index}:")
-        st.dataframe(df)
+        show_frame(df, f"analysis_table_{selected_table_index}")
 
         st.write(f"### Analysis for Table {selected_table_index}:")
         analysis_type = st.selectbox(f"Select analysis type for Table {selected_table_index}", ["Correlation Heatmap", "Pairplot", "Distribution Plot"])
 
+        numeric = numeric_frame(df)
+        if len(df) > MAX_PLOT_ROWS and analysis_type != "Correlation Heatmap":
+            st.caption(f"Plotting a random sample of {MAX_PLOT_ROWS} of {len(df)} rows.")
+
         if analysis_type == "Correlation Heatmap":
             st.write("#### Correlation Heatmap")
-            corr = df.corr()
-            fig, ax = plt.subplots()
-            sns.heatmap(corr, ax=ax, annot=True, cmap="coolwarm")
-            st.pyplot(fig)
+            if numeric.shape[1] < 2:
+                st.info("This table needs at least two numeric columns for a correlation heatmap.")
+            else:
+                st.image(heatmap_png(df))
 
         elif analysis_type == "Pairplot":
             st.write("#### Pairplot")
-            fig = sns.pairplot(df)
-            st.pyplot(fig)
+            if numeric.shape[1] == 0:
+                st.info("This table has no numeric columns to plot.")
+            else:
+                columns = top_columns(numeric)
+                if len(columns) < numeric.shape[1]:
+                    st.caption(f"Plotting the {len(columns)} most varying of {numeric.shape[1]} numeric columns.")
+                st.image(pairplot_png(df))
 
         elif analysis_type == "Distribution Plot":
             st.write("#### Distribution Plot")
             column = st.selectbox(f"Select column for distribution plot in Table {selected_table_index}", df.columns)
-            fig, ax = plt.subplots()
-            sns.histplot(df[column], ax=ax, kde=True)
-            st.pyplot(fig)
+            st.image(histplot_png(df, column))
 
-    elif data_type == "Headlines" and 'headlines' in st.session_state and st.session_state['headlines']:
+    elif data_type == "Headlines" and scraped('headlines'):
         st.write("### Headlines Found:")
-        headlines_df = pd.DataFrame(st.session_state['headlines'], columns=["Headlines"])
-        st.dataframe(headlines_df)
+        headlines_df = list_frame(scraped('headlines'), "Headlines")
+        show_frame(headlines_df, "analysis_headlines")
 
         st.write("### Analysis for Headlines:")
         analysis_type = st.selectbox("Select analysis type for Headlines", ["Word Frequency"])
 
         if analysis_type == "Word Frequency":
             st.write("#### Word Frequency")
-            word_freq = headlines_df['Headlines'].str.split(expand=True).stack().value_counts()
-            st.bar_chart(word_freq)
-
-    elif data_type == "Links" and 'links' in st.session_state and st.session_state['links']:
+            n = st.selectbox("Count:", [1, 2, 3], format_func=lambda n: "Words" if n == 1 else f"{n}-word phrases")
+            top_k = st.slider("Terms to show:", 10, 100, 30)
+            stopwords = not st.checkbox("Include common words (the, of, ...)")
+            kept = [get_result_store().get(handle) for handle in st.session_state.get('headline_history', [])]
+            history = [list_frame(parts["headlines"], "Headlines") for parts in kept if parts]
+            if len(history) > 1 and st.checkbox(f"Count across all {len(history)} scrapes of this session"):
+                word_freq = combined_term_frequency(history, "Headlines", n, top_k, stopwords)
+            else:
+                word_freq = term_frequency(headlines_df, "Headlines", n, top_k, stopwords)
+            if word_freq.empty:
+                st.info("No words to count in these headlines.")
+            else:
+                st.bar_chart(word_freq, horizontal=True)
+
+    elif data_type == "Links" and scraped('links'):
         st.write("### Links Found:")
-        links_df = pd.DataFrame(st.session_state['links'], columns=["Links"])
-        st.dataframe(links_df)
+        links_df = list_frame(scraped('links'), "Links")
+        show_frame(links_df, "analysis_links")
 
         st.write("### Analysis for Links:")
-        analysis_type = st.selectbox("Select analysis type for Links", ["Domain Frequency"])
+        graph = scraped('link_graph')
+        analysis_type = st.selectbox("Select analysis type for Links", ["Domain Frequency", "Most Linked Pages"])
 
         if analysis_type == "Domain Frequency":
             st.write("#### Domain Frequency")
-            domain_freq = links_df['Links'].apply(lambda x: re.findall(r'https?://([^/]+)', x)[0]).value_counts()
+            domain_freq = graph.host_frequency() if graph else domain_frequency(scraped('links'))
             st.bar_chart(domain_freq)
-
-    elif data_type == "Images" and 'images' in st.session_state and st.session_state['images']:
+        elif analysis_type == "Most Linked Pages":
+            st.write("#### Most Linked Pages")
+            if graph:
+                st.dataframe(graph.in_degree().head(100).rename("links").reset_index())
+            else:
+                st.dataframe(links_df['Links'].value_counts().head(100).rename("links").reset_index())
+
+    elif data_type == "Images" and scraped('images'):
         st.write("### Images Found:")
-        images_df = pd.DataFrame(st.session_state['images'], columns=["Image URLs"])
-        st.dataframe(images_df)
-        for img_url in st.session_state['images']:
-            st.image(img_url, caption=img_url)
+        images_df = list_frame(scraped('images'), "Image URLs")
+        show_frame(images_df, "analysis_images")
+        show_asset_report(scraped('images'), "analysis_images", "images")
+        show_image_grid(scraped('images'), "analysis_images")
 
-    elif data_type == "Media Files" and 'media_files' in st.session_state and st.session_state['media_files']:
+    elif data_type == "Media Files" and scraped('media_files'):
         st.write("### Media Files Found:")
-        media_files_df = pd.DataFrame(st.session_state['media_files'], columns=["Media URLs"])
-        st.dataframe(media_files_df)
+        media_files_df = list_frame(scraped('media_files'), "Media URLs")
+        show_frame(media_files_df, "analysis_media")
+        show_asset_report(scraped('media_files'), "analysis_media", "media files")
 
 if selected == "Web Scraping":
     st.title("Web Scraper")
@@ -364,8 +494,35 @@ if selected == "Web Scraping":
     table_indices = st.text_input("Enter table indices to scrape :")
     table_indices = [int(i.strip()) for i in table_indices.split(",") if i.strip().isdigit()]
 
-    if st.button("Start Scraping"):
-        start_scraping(url, scrape_headlines, selected_headlines_tags, scrape_links, scrape_images, scrape_media, table_indices)
+    discover_pages = st.checkbox(
+        "Scrape pages from the site's sitemaps and feeds",
+        help="Reads the sitemaps named in robots.txt (or the URL itself when it is a sitemap or RSS/Atom feed) and scrapes only pages that are new or have a newer lastmod than when they were last scraped this way.",
+    )
+    crawl_pages = not discover_pages and st.checkbox("Crawl linked pages")
+    max_depth, max_pages = 1, 50
+    if crawl_pages:
+        max_depth = st.number_input("Link depth to follow:", min_value=1, max_value=5, value=1)
+        max_pages = st.number_input("Maximum pages to crawl:", min_value=1, max_value=5000, value=50)
+    elif discover_pages:
+        max_pages = st.number_input("Maximum pages to scrape:", min_value=1, max_value=5000, value=50)
+
+    parser = st.selectbox("HTML parser:", available_backends())
+    incremental = st.checkbox("Only show changes since the last scrape", help="Skips unchanged pages and tables and lists added, changed and removed rows.")
+    mode = st.selectbox("Fetch mode:", ["auto", "static", "rendered"], help="auto only starts a browser when the static page is missing content.")
+
+    # Spans of this rerun: submitting the job and showing its results.
+    rendering = Trace("render")
+    with tracing(rendering):
+        if st.button("Start Scraping"):
+            start_scraping(url, scrape_headlines, selected_headlines_tags, scrape_links, scrape_images, scrape_media, table_indices, crawl_pages, max_depth, max_pages, parser, mode, incremental, discover_pages)
+
+        with span("render.results"):
+            show_scrape_job()
+
+    job = get_runner().get(st.session_state.get('scrape_job'))
+    if show_performance and job is not None:
+        show_trace(job.trace, "Scrape timings")
+        show_trace(rendering, "Rendering timings")
 
 elif selected == "Data Cleaning":
     data_cleaning()
@@ -0,0 +1,165 @@
+import io
+import numpy as np
+import pandas as pd
+from cleaning import fingerprint
+from lru import LRUCache
+from textstats import STOPWORDS, TOP_TERMS, TermCounter
+
+# Above these sizes plots are drawn from a sample / the most varying columns.
+MAX_PLOT_ROWS = 2000
+MAX_PLOT_COLUMNS = 6
+# Share of filled cells that must parse as numbers for a column to count as numeric.
+NUMERIC_RATIO = 0.8
+MAX_CACHED = 32
+
+_cache = LRUCache(MAX_CACHED)
+
+
+def _coerce(df):
+    columns = {}
+    for column in df.columns:
+        series = df[column]
+        if pd.api.types.is_bool_dtype(series):
+            continue
+        if pd.api.types.is_numeric_dtype(series):
+            columns[column] = series.astype("float64")
+            continue
+        if series.dtype != object and not isinstance(series.dtype, (pd.StringDtype, pd.CategoricalDtype)):
+            continue
+        filled = series.notna() & (series.astype(str).str.strip() != "")
+        if not filled.any():
+            continue
+        numbers = pd.to_numeric(series.astype(str).str.replace(",", "", regex=False), errors="coerce")
+        if numbers[filled].notna().mean() >= NUMERIC_RATIO:
+            columns[column] = numbers.astype("float64")
+    return pd.DataFrame(columns, index=df.index)
+
+
+def numeric_frame(df):
+    """Return the numeric columns of a table as float64, coercing number-like strings once per table."""
+    return _cache.cached((fingerprint(df), "numeric"), lambda: _coerce(df))
+
+
+def correlation(df):
+    """Pairwise Pearson correlation of the numeric columns, computed with NumPy.
+
+    Like DataFrame.corr(), each pair of columns uses the rows where both are
+    present; the pair sums come from a handful of matrix products instead of
+    one pass per column pair.
+    """
+    numeric = numeric_frame(df)
+    values = numeric.to_numpy(dtype="float64")
+    present = ~np.isnan(values)
+    x = np.where(present, values, 0.0)
+    m = present.astype("float64")
+
+    n = m.T @ m
+    sum_x = x.T @ m
+    sum_xx = (x * x).T @ m
+    sum_xy = x.T @ x
+    with np.errstate(invalid="ignore", divide="ignore"):
+        cov = n * sum_xy - sum_x * sum_x.T
+        var = (n * sum_xx - sum_x ** 2) * (n * sum_xx.T - sum_x.T ** 2)
+        corr = cov / np.sqrt(var)
+    corr[n < 2] = np.nan
+    np.fill_diagonal(corr, np.where(np.diag(n) >= 2, 1.0, np.nan))
+    return pd.DataFrame(np.clip(corr, -1.0, 1.0), index=numeric.columns, columns=numeric.columns)
+
+
+def sample_rows(df, max_rows=MAX_PLOT_ROWS, seed=0):
+    """Return a uniform random sample of at most max_rows rows, kept in table order."""
+    if len(df) <= max_rows:
+        return df
+    positions = np.sort(np.random.default_rng(seed).choice(len(df), size=max_rows, replace=False))
+    return df.iloc[positions]
+
+
+def top_columns(numeric, max_columns=MAX_PLOT_COLUMNS):
+    """Return the max_columns numeric columns with the highest variance."""
+    if numeric.shape[1] <= max_columns:
+        return list(numeric.columns)
+    variance = numeric.var().fillna(0)
+    return list(variance.sort_values(ascending=False).index[:max_columns])
+
+
+def _term_counter(df, column, n, stopwords):
+    def build():
+        return TermCounter(n, STOPWORDS if stopwords else frozenset()).update(df[column])
+
+    return _cache.cached((fingerprint(df), "terms", column, n, stopwords), build)
+
+
+def _top_terms(counter, k):
+    top = counter.top(k)
+    return pd.Series([count for _, count in top], index=pd.Index([term for term, _ in top], name="term"), name="count")
+
+
+def term_frequency(df, column, n=1, k=TOP_TERMS, stopwords=True):
+    """Return the k most frequent words (n=1) or n-grams of a text column, counted once per table."""
+    return _top_terms(_term_counter(df, column, n, stopwords), k)
+
+
+def combined_term_frequency(frames, column, n=1, k=TOP_TERMS, stopwords=True):
+    """Return the k most frequent words or n-grams of a text column across several tables.
+
+    Each table is counted once and cached as for term_frequency(); only the
+    merge is redone, so adding one more scrape counts just its own rows.
+    """
+    total = TermCounter(n, STOPWORDS if stopwords else frozenset())
+    for df in frames:
+        total.merge(_term_counter(df, column, n, stopwords))
+    return _top_terms(total, k)
+
+
+def _plotting():
+    """Import pyplot and seaborn on first use; they dominate this module's import time."""
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+    return plt, sns
+
+
+def _png(fig):
+    plt, _ = _plotting()
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format="png", bbox_inches="tight")
+    plt.close(fig)
+    return buffer.getvalue()
+
+
+def heatmap_png(df):
+    """Render the correlation heatmap of a table as PNG bytes, cached per table."""
+    def render():
+        corr = correlation(df)
+        plt, sns = _plotting()
+        fig, ax = plt.subplots()
+        sns.heatmap(corr, ax=ax, annot=len(corr) <= 12, cmap="coolwarm")
+        return _png(fig)
+
+    return _cache.cached((fingerprint(df), "heatmap"), render)
+
+
+def pairplot_png(df, max_rows=MAX_PLOT_ROWS, max_columns=MAX_PLOT_COLUMNS):
+    """Render a pairplot of a sample of rows and the most varying numeric columns."""
+    def render():
+        numeric = numeric_frame(df)
+        sample = sample_rows(numeric[top_columns(numeric, max_columns)], max_rows)
+        _, sns = _plotting()
+        grid = sns.pairplot(sample)
+        return _png(grid.figure)
+
+    return _cache.cached((fingerprint(df), "pairplot", max_rows, max_columns), render)
+
+
+def histplot_png(df, column, max_rows=MAX_PLOT_ROWS):
+    """Render the distribution of one column from a sample of rows."""
+    def render():
+        numeric = numeric_frame(df)
+        series = numeric[column] if column in numeric.columns else df[column].astype(object)
+        plt, sns = _plotting()
+        fig, ax = plt.subplots()
+        sns.histplot(sample_rows(series, max_rows), ax=ax, kde=column in numeric.columns)
+        return _png(fig)
+
+    return _cache.cached((fingerprint(df), "histplot", column, max_rows), render)
@@ -0,0 +1,149 @@
+import io
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+import fetch
+from lru import LRUCache
+from politeness import RobotsDisallowed
+
+PROBE_WORKERS = 16
+# Bytes requested per asset; enough for the dimensions in any common image header.
+PROBE_BYTES = 64 * 1024
+# Larger images are not downloaded for thumbnails.
+MAX_THUMBNAIL_SOURCE_BYTES = 16 * 1024 * 1024
+THUMBNAIL_SIZE = (192, 192)
+MAX_CACHED_PROBES = 20000
+MAX_CACHED_THUMBNAILS = 512
+PROBE_TTL = 3600
+
+AssetInfo = namedtuple("AssetInfo", ["url", "ok", "status", "content_type", "size", "width", "height", "error"])
+
+_probes = LRUCache(MAX_CACHED_PROBES, ttl=PROBE_TTL)
+_thumbnails = LRUCache(MAX_CACHED_THUMBNAILS)
+
+
+def _total_size(response):
+    content_range = response.headers.get("Content-Range", "")
+    total = content_range.rpartition("/")[2]
+    if total.isdigit():
+        return int(total)
+    length = response.headers.get("Content-Length", "")
+    return int(length) if response.status_code == 200 and length.isdigit() else None
+
+
+def image_size(head):
+    """Return (width, height) parsed from the first bytes of an image, or (None, None)."""
+    try:
+        from PIL import ImageFile
+    except ImportError:
+        return None, None
+    parser = ImageFile.Parser()
+    try:
+        parser.feed(head)
+    except Exception:
+        return None, None
+    if parser.image is None:
+        return None, None
+    return parser.image.size
+
+
+def _download(url, headers=None, limit=PROBE_BYTES):
+    """GET url through the shared session and politeness limits; return (response, first limit bytes)."""
+    politeness = fetch.get_politeness()
+    if not politeness.allowed(url):
+        raise RobotsDisallowed(f"{url} is disallowed by robots.txt")
+    politeness.wait(url)
+    with fetch.get_session().get(url, headers=headers, timeout=fetch.TIMEOUT, stream=True) as response:
+        politeness.record(url, response.status_code, response.headers)
+        body = bytearray()
+        for chunk in response.iter_content(chunk_size=16 * 1024):
+            body += chunk
+            if len(body) >= limit:
+                break
+        return response, bytes(body[:limit])
+
+
+def probe(url):
+    """Check one image or media URL with a ranged GET, cached for PROBE_TTL seconds.
+
+    Only the first PROBE_BYTES are transferred; the total size comes from
+    Content-Range or Content-Length and image dimensions from the header
+    bytes.
+    """
+    cached = _probes.get(url)
+    if cached is not None:
+        return cached
+    try:
+        response, head = _download(url, {"Range": f"bytes=0-{PROBE_BYTES - 1}", "Accept-Encoding": "identity"})
+    except Exception as e:
+        info = AssetInfo(url, False, None, None, None, None, None, f"Error occurred: {str(e)}")
+    else:
+        info = _asset_info(url, response, head)
+    _probes.put(url, info)
+    return info
+
+
+def _asset_info(url, response, head):
+    content_type = response.headers.get("Content-Type", "").split(";")[0].strip() or None
+    width, height = image_size(head) if content_type is None or content_type.startswith("image/") else (None, None)
+    ok = response.status_code in (200, 206)
+    return AssetInfo(url, ok, response.status_code, content_type, _total_size(response), width, height, None)
+
+
+def probe_all(urls, max_workers=PROBE_WORKERS):
+    """Probe many URLs concurrently and return their AssetInfo in the same order."""
+    urls = list(urls)
+    unique = list(dict.fromkeys(urls))
+    if not unique:
+        return []
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(unique)), thread_name_prefix="probe") as pool:
+        results = dict(zip(unique, pool.map(probe, unique)))
+    return [results[url] for url in urls]
+
+
+def thumbnail(url, size=THUMBNAIL_SIZE):
+    """Return a small JPEG/PNG rendition of an image as bytes, or None when it cannot be made."""
+    cached = _thumbnails.get((url, size))
+    if cached is not None:
+        return cached or None
+    data = b""
+    try:
+        from PIL import Image
+
+        response, body = _download(url, limit=MAX_THUMBNAIL_SOURCE_BYTES + 1)
+        # The full download answers a probe as well.
+        if _probes.get(url) is None:
+            _probes.put(url, _asset_info(url, response, body[:PROBE_BYTES]))
+        if response.status_code == 200 and len(body) <= MAX_THUMBNAIL_SOURCE_BYTES:
+            with Image.open(io.BytesIO(body)) as image:
+                image.thumbnail(size)
+                out = io.BytesIO()
+                if image.mode in ("RGBA", "LA", "P"):
+                    image.save(out, format="PNG", optimize=True)
+                else:
+                    image.convert("RGB").save(out, format="JPEG", quality=80)
+                data = out.getvalue()
+    except Exception:
+        pass
+    # b"" marks images that could not be thumbnailed, so they are not retried on every rerun.
+    _thumbnails.put((url, size), data)
+    return data or None
+
+
+def cached_previews(urls, size=THUMBNAIL_SIZE):
+    """Return the cached (thumbnail, AssetInfo) of each URL without fetching anything.
+
+    Either is None when not cached yet; the thumbnail is b"" for images that
+    could not be thumbnailed.
+    """
+    return [(_thumbnails.get((url, size)), _probes.get(url)) for url in urls]
+
+
+def thumbnails(urls, size=THUMBNAIL_SIZE, max_workers=PROBE_WORKERS):
+    """Make thumbnails for a page of images concurrently; returns bytes or None per URL."""
+    urls = list(urls)
+    unique = list(dict.fromkeys(urls))
+    if not unique:
+        return []
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(unique)), thread_name_prefix="thumb") as pool:
+        results = dict(zip(unique, pool.map(lambda url: thumbnail(url, size), unique)))
+    return [results[url] for url in urls]
@@ -0,0 +1,67 @@
+"""Benchmark parse + extract time per parser backend.
+
+Usage:
+    python bench_parsers.py [saved_page.html ...] [--repeat N]
+
+Pass saved copies of large pages (for example long Wikipedia list articles
+saved from the browser). Without arguments a generated list page is used.
+"""
+import argparse
+import os
+import time
+from parsers import parse, available_backends
+from extract import TableExtractor, HeadlineExtractor, LinkExtractor, SourceExtractor, MetadataExtractor, run_extractors
+
+
+def generated_list_page(rows=20000, tables=3):
+    """Build a long Wikipedia-style list page."""
+    parts = ["<html><head><title>List</title><meta name='description' content='list'></head><body>"]
+    for t in range(tables):
+        parts.append(f"<h2>Section {t}</h2><table class='wikitable sortable'><tr><th>Rank</th><th>Name</th><th>Value</th></tr>")
+        for r in range(rows // tables):
+            parts.append(f"<tr><td>{r}</td><td><a href='https://en.wikipedia.org/wiki/Item_{r}'>Item {r}</a></td><td>{r * 37 % 10007:,}</td></tr>")
+        parts.append("</table>")
+    parts.append("</body></html>")
+    return "".join(parts)
+
+
+def extract_all(html, backend):
+    document = parse(html, backend)
+    extractors = [
+        TableExtractor(),
+        HeadlineExtractor(["h1", "h2", "h3"]),
+        LinkExtractor(),
+        SourceExtractor(["img"]),
+        SourceExtractor(["audio", "video", "source"]),
+        MetadataExtractor(),
+    ]
+    return run_extractors(document, extractors)
+
+
+def bench(name, html, repeat):
+    print(f"{name} ({len(html) / 1e6:.1f} MB)")
+    for backend in available_backends():
+        best = float("inf")
+        for _ in range(repeat):
+            start = time.perf_counter()
+            tables, headlines, links = extract_all(html, backend)[:3]
+            best = min(best, time.perf_counter() - start)
+        rows = sum(len(df) for df in tables)
+        print(f"  {backend:<12} {best * 1000:9.1f} ms  tables={len(tables)} rows={rows} headlines={len(headlines)} links={len(links)}")
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("pages", nargs="*", help="saved HTML pages")
+    arg_parser.add_argument("--repeat", type=int, default=3)
+    args = arg_parser.parse_args()
+
+    if not args.pages:
+        bench("generated list page", generated_list_page(), args.repeat)
+    for path in args.pages:
+        with open(path, encoding="utf-8", errors="replace") as f:
+            bench(os.path.basename(path), f.read(), args.repeat)
+
+
+if __name__ == "__main__":
+    main()
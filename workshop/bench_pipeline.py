@@ -0,0 +1,312 @@
+"""Benchmark the scrape -> extract -> clean -> analyze pipeline stage by stage, offline.
+
+Usage:
+    python bench_pipeline.py [--corpus DIR] [--repeat N] [--json results.json] [--compare baseline.json]
+    python bench_pipeline.py --corpus DIR --record URL [URL ...]
+
+Pages are served from a local stand-in HTTP server, so runs do not depend
+on the network. --corpus is a directory of recorded .html pages; --record
+downloads the given URLs into it first. Without --corpus a generated corpus
+is used: a small article, a long multi-table Wikipedia-style list, a page
+with thousands of links and a page of tables with rowspan/colspan.
+
+Every page goes through fetch (requests, and Selenium unless --static-only),
+parse, table build, the other extractors, cleaning and plot preparation.
+Each stage reports its best time over --repeat runs and its peak traced
+memory (tracemalloc; memory held by lxml and the browser is not seen).
+Results are written as JSON so that two runs can be compared with --compare.
+"""
+import argparse
+import gzip
+import json
+import os
+import platform
+import re
+import sys
+import threading
+import time
+import tracemalloc
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import fetch
+import analysis
+import cleaning
+from analysis import correlation, numeric_frame, sample_rows, top_columns
+from bench_parsers import generated_list_page
+from cleaning import STEPS, run_pipeline
+from extract import TableExtractor, HeadlineExtractor, LinkExtractor, SourceExtractor, MetadataExtractor, run_extractors
+from linkgraph import domain_frequency
+from parsers import DEFAULT_BACKEND, available_backends, parse
+
+# Ratio to the baseline above which --compare flags a stage.
+REGRESSION = 1.2
+
+
+def small_article():
+    parts = ["<html><head><title>Article</title><meta name='description' content='A short article'></head><body><h1>Article</h1>"]
+    for i in range(12):
+        parts.append(f"<h2>Section {i}</h2><p>Paragraph {i} with <a href='/wiki/Topic_{i}'>a link</a> and <img src='/img/{i}.png'>.</p>")
+    parts.append("<table class='wikitable'><tr><th>Year</th><th>Population</th><th>Change</th></tr>")
+    for year in range(2000, 2012):
+        parts.append(f"<tr><td>{year}</td><td>{1000 + year * 3:,}</td><td>{year % 7 - 3}%</td></tr>")
+    parts.append("</table></body></html>")
+    return "".join(parts)
+
+
+def many_links_page(links=5000):
+    parts = ["<html><head><title>Index</title></head><body><h1>Index</h1><ul>"]
+    for i in range(links):
+        href = f"https://example{i % 50}.org/section/{i // 50}/page_{i}?utm_source=bench&id={i}" if i % 3 else f"/local/page_{i}#top"
+        parts.append(f"<li><a href='{href}'>Page {i}</a></li>")
+    parts.append("</ul></body></html>")
+    return "".join(parts)
+
+
+def spanning_tables_page(tables=30, rows=200):
+    parts = ["<html><head><title>Results</title></head><body>"]
+    for t in range(tables):
+        parts.append(
+            f"<h2>Season {t}</h2><table class='wikitable'>"
+            "<tr><th rowspan='2'>Round</th><th colspan='2'>Home</th><th colspan='2'>Away</th><th rowspan='2'>Date</th></tr>"
+            "<tr><th>Team</th><th>Goals</th><th>Team</th><th>Goals</th></tr>"
+        )
+        for r in range(rows):
+            if r % 10 == 0:
+                parts.append(f"<tr><td rowspan='10'>{r // 10 + 1}</td>")
+            else:
+                parts.append("<tr>")
+            parts.append(f"<td>Team {r % 17}</td><td>{r % 5}</td><td>Team {(r + 3) % 17}</td><td>{r % 4}[{r % 3}]</td><td>2023-{r % 12 + 1:02d}-{r % 28 + 1:02d}</td></tr>")
+        parts.append("</table>")
+    parts.append("</body></html>")
+    return "".join(parts)
+
+
+def generated_corpus():
+    """Return {name: html} for the built-in corpus."""
+    return {
+        "small_article": small_article(),
+        "wiki_list_huge": generated_list_page(rows=60000, tables=6),
+        "many_links": many_links_page(),
+        "spanning_tables": spanning_tables_page(),
+    }
+
+
+def load_corpus(directory):
+    """Return {name: html} for the .html/.htm files in a directory."""
+    corpus = {}
+    for entry in sorted(os.listdir(directory)):
+        name, ext = os.path.splitext(entry)
+        if ext.lower() in (".html", ".htm"):
+            with open(os.path.join(directory, entry), encoding="utf-8", errors="replace") as f:
+                corpus[name] = f.read()
+    return corpus
+
+
+def record(urls, directory):
+    """Download pages into the corpus directory, named after their URLs."""
+    os.makedirs(directory, exist_ok=True)
+    for url in urls:
+        name = re.sub(r"[^A-Za-z0-9]+", "_", url.split("://", 1)[-1]).strip("_")[:100]
+        with open(os.path.join(directory, name + ".html"), "w", encoding="utf-8") as f:
+            f.write(fetch.download(url))
+        print(f"recorded {url} -> {name}.html", file=sys.stderr)
+
+
+def serve(corpus):
+    """Serve the corpus at /<name>.html from a local server; returns (server, base URL)."""
+    pages = {}
+    for name, html in corpus.items():
+        body = html.encode("utf-8")
+        pages[f"/{name}.html"] = (body, gzip.compress(body, 6))
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        # Headers and body go out as separate writes; without this small pages wait for a delayed ACK.
+        disable_nagle_algorithm = True
+
+        def do_GET(self):
+            page = pages.get(self.path.split("?", 1)[0])
+            if page is None:
+                self.send_response(404)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            compressed = "gzip" in self.headers.get("Accept-Encoding", "")
+            body = page[1] if compressed else page[0]
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            if compressed:
+                self.send_header("Content-Encoding", "gzip")
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def measure(run, repeat, setup=None):
+    """Return (best seconds, peak traced bytes, result) of run(*setup()).
+
+    The first, untimed call runs under tracemalloc and doubles as warm-up;
+    setup() prepares fresh inputs outside the measurement.
+    """
+    args = setup() if setup else ()
+    tracemalloc.start()
+    try:
+        result = run(*args)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    best = float("inf")
+    for _ in range(repeat):
+        args = setup() if setup else ()
+        start = time.perf_counter()
+        result = run(*args)
+        best = min(best, time.perf_counter() - start)
+    return best, peak, result
+
+
+def _cold(tables):
+    # Cleaning and analysis cache by table content; start every run without them.
+    cleaning._results.clear()
+    analysis._cache.clear()
+    return ([df.copy() for df in tables],)
+
+
+def clean_tables(tables):
+    return [run_pipeline(df, list(STEPS)) for df in tables]
+
+
+def prepare_plots(tables, links):
+    for df in tables:
+        numeric = numeric_frame(df)
+        correlation(df)
+        sample_rows(df)
+        top_columns(numeric)
+    if links:
+        domain_frequency(links)
+
+
+def extract_other(document, url):
+    extractors = [
+        HeadlineExtractor(["h1", "h2", "h3"]),
+        LinkExtractor(url),
+        SourceExtractor(["img"], url),
+        SourceExtractor(["audio", "video", "source"], url),
+        MetadataExtractor(),
+    ]
+    return run_extractors(document, extractors)
+
+
+def bench_page(url, html, backend, repeat, rendered):
+    stages = {}
+
+    def stage(name, run, setup=None):
+        try:
+            seconds, peak, result = measure(run, repeat, setup)
+        except Exception as e:
+            stages[name] = {"error": f"Error occurred: {str(e)}"}
+            return None
+        stages[name] = {"seconds": seconds, "peak_bytes": peak}
+        return result
+
+    stage("fetch", lambda: fetch.download(url))
+    if rendered:
+        stage("fetch_rendered", lambda: fetch.fetch_html(url, mode="rendered"))
+    document = stage("parse", lambda: parse(html, backend))
+    tables = stage("tables", lambda: run_extractors(document, [TableExtractor()])[0]) or []
+    other = stage("extract", lambda: extract_other(document, url))
+    links = other[1] if other else []
+    stage("clean", clean_tables, lambda: _cold(tables))
+    stage("plot_prep", lambda tables: prepare_plots(tables, links), lambda: _cold(tables))
+    return {
+        "bytes": len(html.encode("utf-8")),
+        "tables": len(tables),
+        "rows": sum(len(df) for df in tables),
+        "links": len(links),
+        "stages": stages,
+    }
+
+
+def report(name, page):
+    print(f"{name} ({page['bytes'] / 1e6:.2f} MB, {page['tables']} tables, {page['rows']} rows, {page['links']} links)")
+    for stage, result in page["stages"].items():
+        if "error" in result:
+            print(f"  {stage:<15} {result['error']}")
+        else:
+            print(f"  {stage:<15} {result['seconds'] * 1000:9.1f} ms  peak {result['peak_bytes'] / 1e6:8.2f} MB")
+
+
+def compare(results, baseline):
+    """Print each stage's time against a baseline run; returns True when a stage got slower by REGRESSION."""
+    regressed = False
+    print(f"\nagainst {baseline.get('created', 'baseline')}:")
+    width = max((len(name) for name in results["pages"]), default=0)
+    for name, page in results["pages"].items():
+        old_page = baseline.get("pages", {}).get(name)
+        if not old_page:
+            continue
+        for stage, result in page["stages"].items():
+            old = old_page["stages"].get(stage, {})
+            if "seconds" not in result or "seconds" not in old or not old["seconds"]:
+                continue
+            ratio = result["seconds"] / old["seconds"]
+            flag = "  SLOWER" if ratio > REGRESSION else ""
+            regressed = regressed or bool(flag)
+            print(f"  {name:<{width}} {stage:<15} {old['seconds'] * 1000:9.1f} -> {result['seconds'] * 1000:9.1f} ms  x{ratio:.2f}{flag}")
+    return regressed
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("--corpus", help="directory of recorded .html pages (default: generated pages)")
+    arg_parser.add_argument("--record", nargs="+", metavar="URL", help="download these pages into --corpus first")
+    arg_parser.add_argument("--repeat", type=int, default=3)
+    arg_parser.add_argument("--parser", choices=available_backends(), default=DEFAULT_BACKEND)
+    arg_parser.add_argument("--static-only", action="store_true", help="skip the Selenium fetch")
+    arg_parser.add_argument("--json", help="write the results to this file, - for stdout")
+    arg_parser.add_argument("--compare", help="earlier --json output to compare against")
+    args = arg_parser.parse_args()
+    if args.record and not args.corpus:
+        arg_parser.error("--record needs --corpus")
+
+    if args.record:
+        record(args.record, args.corpus)
+    corpus = load_corpus(args.corpus) if args.corpus else generated_corpus()
+    # Measure the pipeline, not the response cache or the politeness limits.
+    fetch.configure(cache_path=None, rate=1e6, burst=1e6, respect_robots=False)
+    server, base = serve(corpus)
+
+    results = {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "parser": args.parser,
+        "repeat": args.repeat,
+        "pages": {},
+    }
+    try:
+        for name, html in corpus.items():
+            page = results["pages"][name] = bench_page(f"{base}/{name}.html", html, args.parser, args.repeat, not args.static_only)
+            report(name, page)
+    finally:
+        server.shutdown()
+
+    if args.json == "-":
+        json.dump(results, sys.stdout, indent=2)
+    elif args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            if compare(results, json.load(f)):
+                sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
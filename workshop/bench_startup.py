@@ -0,0 +1,86 @@
+"""Measure cold-start import cost of the apps with `python -X importtime`.
+
+Usage:
+    python bench_startup.py [target ...] [--repeat N] [--top N] [--budget-ms MS]
+
+Targets are Streamlit scripts (App.py, app1.py, project.py), which are run
+in bare mode as on their first page, or module names such as cli and
+scraper. Each target is started in a fresh interpreter; the best of
+--repeat runs is reported together with the heaviest top-level imports.
+Exits non-zero when a target imports one of its forbidden modules or its
+import time exceeds --budget-ms, so it can guard against regressions.
+"""
+import argparse
+import os
+import re
+import subprocess
+import sys
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+# Modules that must not be loaded at startup, per target.
+FORBIDDEN = {
+    "App.py": ("matplotlib", "seaborn", "selenium", "webdriver_manager", "requests", "bs4"),
+    "app1.py": ("matplotlib", "seaborn", "selenium", "webdriver_manager"),
+    "project.py": ("matplotlib", "seaborn", "selenium", "webdriver_manager"),
+    "cli": ("streamlit", "matplotlib", "seaborn", "selenium"),
+    "scraper": ("streamlit", "matplotlib", "seaborn", "selenium"),
+}
+LINE_RE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+
+def import_times(target):
+    """Start target in a fresh interpreter; return [(self_us, cumulative_us, depth, module)]."""
+    if target.endswith(".py"):
+        code = f"import runpy, sys; sys.path.insert(0, {HERE!r}); runpy.run_path({os.path.join(HERE, target)!r})"
+    else:
+        code = f"import sys; sys.path.insert(0, {HERE!r}); import {target}"
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", code], capture_output=True, text=True, cwd=HERE)
+    if proc.returncode != 0:
+        raise RuntimeError(f"{target} failed to start:\n{proc.stderr[-2000:]}")
+    rows = []
+    for line in proc.stderr.splitlines():
+        match = LINE_RE.match(line)
+        if match:
+            rows.append((int(match[1]), int(match[2]), len(match[3]) // 2, match[4]))
+    return rows
+
+
+def bench(target, repeat, top):
+    best = None
+    for _ in range(repeat):
+        rows = import_times(target)
+        if best is None or sum(r[0] for r in rows) < sum(r[0] for r in best):
+            best = rows
+    total = sum(r[0] for r in best) / 1000
+    modules = {r[3] for r in best}
+    forbidden = sorted(
+        name for name in FORBIDDEN.get(target, ()) if any(m == name or m.startswith(name + ".") for m in modules)
+    )
+    print(f"{target}: {total:.0f} ms in {len(best)} imports")
+    # For a module target, list what it pulls in rather than the module itself.
+    level = 0 if target.endswith(".py") else 1
+    for self_us, cumulative, depth, module in sorted((r for r in best if r[2] == level), key=lambda r: -r[1])[:top]:
+        print(f"  {cumulative / 1000:8.1f} ms  {module}")
+    if forbidden:
+        print(f"  imports forbidden at startup: {', '.join(forbidden)}")
+    return total, forbidden
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("targets", nargs="*", default=list(FORBIDDEN))
+    arg_parser.add_argument("--repeat", type=int, default=3)
+    arg_parser.add_argument("--top", type=int, default=10, help="heaviest top-level imports to list")
+    arg_parser.add_argument("--budget-ms", type=float, help="fail when a target's import time exceeds this")
+    args = arg_parser.parse_args()
+
+    failed = False
+    for target in args.targets:
+        total, forbidden = bench(target, args.repeat, args.top)
+        if forbidden or (args.budget_ms is not None and total > args.budget_ms):
+            failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+import atexit
+import queue
+import threading
+from contextlib import contextmanager
+from selenium import webdriver
+from selenium.common.exceptions import TimeoutException
+from selenium.webdriver.chrome.service import Service
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
+from webdriver_manager.chrome import ChromeDriverManager
+
+POOL_SIZE = 2
+MAX_USES = 50
+# Seconds to wait for the page to become ready.
+READY_TIMEOUT = 10
+
+_driver_path = None
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def driver_path():
+    """Install chromedriver once per process and return its path."""
+    global _driver_path
+    with _pool_lock:
+        if _driver_path is None:
+            _driver_path = ChromeDriverManager().install()
+        return _driver_path
+
+
+def new_driver():
+    """Launch a headless Chrome that returns from get() once the DOM is ready."""
+    options = webdriver.ChromeOptions()
+    options.add_argument("--headless")
+    options.add_argument("--disable-gpu")
+    options.add_argument("--no-sandbox")
+    options.page_load_strategy = "eager"
+    return webdriver.Chrome(service=Service(driver_path()), options=options)
+
+
+def _quit(driver):
+    try:
+        driver.quit()
+    except Exception:
+        pass
+
+
+class BrowserPool:
+    """Size-bounded pool of warm headless browsers.
+
+    Browsers are checked out per scrape, returned afterwards and replaced
+    once they have served max_uses pages or raised an error.
+    """
+
+    def __init__(self, size=POOL_SIZE, max_uses=MAX_USES):
+        self.max_uses = max_uses
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+
+    @contextmanager
+    def session(self):
+        self._slots.acquire()
+        try:
+            try:
+                driver, uses = self._idle.get_nowait()
+            except queue.Empty:
+                driver, uses = new_driver(), 0
+            try:
+                yield driver
+            except BaseException:
+                # The browser may be wedged or dead; never hand it out again.
+                _quit(driver)
+                raise
+            uses += 1
+            if uses >= self.max_uses:
+                _quit(driver)
+            else:
+                self._idle.put((driver, uses))
+        finally:
+            self._slots.release()
+
+    def warm(self, count=1):
+        """Start browsers ahead of the first scrape."""
+        for _ in range(count):
+            self._idle.put((new_driver(), 0))
+
+    def close(self):
+        while True:
+            try:
+                driver, _ = self._idle.get_nowait()
+            except queue.Empty:
+                return
+            _quit(driver)
+
+
+def get_pool():
+    """Return the process-wide browser pool."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = BrowserPool()
+            atexit.register(_pool.close)
+        return _pool
+
+
+def render(url, ready_selector=None, timeout=READY_TIMEOUT):
+    """Render url in a pooled browser and return the page source.
+
+    Waits until ready_selector matches, or until the document has finished
+    loading when no selector is given. Pages that never become ready are
+    returned as they are after timeout seconds.
+    """
+    with get_pool().session() as driver:
+        driver.get(url)
+        if ready_selector:
+            condition = EC.presence_of_element_located((By.CSS_SELECTOR, ready_selector))
+        else:
+            condition = lambda d: d.execute_script("return document.readyState") == "complete"
+        try:
+            WebDriverWait(driver, timeout).until(condition)
+        except TimeoutException:
+            pass
+        return driver.page_source
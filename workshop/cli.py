@@ -0,0 +1,235 @@
+"""Scrape a list of URLs without the Streamlit UI.
+
+    python cli.py urls.txt --output results/ --concurrency 8 --headlines h1,h2 --links
+    python cli.py urls.txt --sqlite results.sqlite --crawl-depth 1 --max-pages 20
+"""
+import argparse
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import pandas as pd
+import fetch
+import parse_pool
+from export import file_name, write_frame
+from jobs import Job
+from parsers import BACKENDS, DEFAULT_BACKEND
+from scraper import run_scrape
+from tracing import TRACE_LOG, tracing
+
+DEFAULT_CONCURRENCY = 4
+FORMAT_NAMES = {"csv": "CSV", "parquet": "Parquet", "feather": "Feather", "arrow": "Arrow IPC stream"}
+LIST_COLUMNS = {
+    "headlines": "Headlines",
+    "links": "Links",
+    "images": "Image URLs",
+    "media_files": "Media URLs",
+}
+
+
+def read_urls(path):
+    """Read one URL per line, skipping blank lines and # comments; "-" reads stdin."""
+    handle = sys.stdin if path == "-" else open(path, encoding="utf-8")
+    with handle:
+        urls = [line.strip() for line in handle]
+    return [url for url in urls if url and not url.startswith("#")]
+
+
+def _url_slug(url):
+    digest = hashlib.blake2b(url.encode("utf-8"), digest_size=4).hexdigest()
+    return re.sub(r"[^A-Za-z0-9]+", "_", url.split("://", 1)[-1]).strip("_")[:80] + "-" + digest
+
+
+class DirectoryWriter:
+    """Write each page's artifacts into its own sub-directory, plus an index.jsonl."""
+
+    def __init__(self, path, fmt="CSV"):
+        self.path = path
+        self.fmt = fmt
+        os.makedirs(path, exist_ok=True)
+        self._index = open(os.path.join(path, "index.jsonl"), "a", encoding="utf-8")
+
+    def write(self, url, result, job):
+        table_data, headlines, links, images, media_files, metadata, error = result
+        directory = os.path.join(self.path, _url_slug(url))
+        os.makedirs(directory, exist_ok=True)
+        artifacts = [(f"table_{i}", df) for i, df in enumerate(table_data or [], 1)]
+        for name, values in zip(LIST_COLUMNS, (headlines, links, images, media_files)):
+            if values:
+                artifacts.append((name, pd.DataFrame(values, columns=[LIST_COLUMNS[name]])))
+        for name, df in artifacts:
+            with open(os.path.join(directory, file_name(name, self.fmt)), "wb") as out:
+                write_frame(df, self.fmt, out)
+        summary = {
+            "url": url,
+            "directory": os.path.basename(directory),
+            "scraped_at": time.time(),
+            "error": error,
+            "metadata": metadata,
+            "files": [file_name(name, self.fmt) for name, _ in artifacts],
+            "messages": job.messages,
+        }
+        with open(os.path.join(directory, "page.json"), "w", encoding="utf-8") as out:
+            json.dump(summary, out, indent=2)
+        self._index.write(json.dumps({key: summary[key] for key in ("url", "directory", "error")}) + "\n")
+        self._index.flush()
+
+    def close(self):
+        self._index.close()
+
+
+class SqliteWriter:
+    """Write all pages into one SQLite database; rescraping a URL replaces its rows."""
+
+    def __init__(self, path):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path)
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS pages (
+                url TEXT PRIMARY KEY,
+                scraped_at REAL NOT NULL,
+                error TEXT,
+                metadata TEXT,
+                messages TEXT
+            );
+            CREATE TABLE IF NOT EXISTS items (
+                url TEXT NOT NULL,
+                kind TEXT NOT NULL,
+                position INTEGER NOT NULL,
+                value TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS items_url ON items (url);
+            CREATE TABLE IF NOT EXISTS page_tables (
+                url TEXT NOT NULL,
+                position INTEGER NOT NULL,
+                data TEXT NOT NULL,
+                PRIMARY KEY (url, position)
+            );
+            """
+        )
+
+    def write(self, url, result, job):
+        table_data, headlines, links, images, media_files, metadata, error = result
+        with self._conn:
+            for table in ("pages", "items", "page_tables"):
+                self._conn.execute(f"DELETE FROM {table} WHERE url = ?", (url,))
+            self._conn.execute(
+                "INSERT INTO pages VALUES (?, ?, ?, ?, ?)",
+                (url, time.time(), error, json.dumps(metadata), json.dumps(job.messages)),
+            )
+            for kind, values in zip(LIST_COLUMNS, (headlines, links, images, media_files)):
+                self._conn.executemany(
+                    "INSERT INTO items VALUES (?, ?, ?, ?)",
+                    ((url, kind, i, value) for i, value in enumerate(values or [])),
+                )
+            self._conn.executemany(
+                "INSERT INTO page_tables VALUES (?, ?, ?)",
+                (
+                    (url, i, df.to_json(orient="split", index=False, date_format="iso"))
+                    for i, df in enumerate(table_data or [], 1)
+                ),
+            )
+
+    def close(self):
+        self._conn.close()
+
+
+def scrape_url(job, url, args):
+    """Scrape one URL on a worker thread, turning unexpected failures into an error result."""
+    try:
+        with tracing(job.trace):
+            return run_scrape(
+                job, url, bool(args.headlines), args.headlines, args.links, args.images, args.media, args.tables,
+                args.crawl_depth > 0, args.crawl_depth, args.max_pages, args.parser, args.mode, args.incremental, args.discover,
+            )
+    except Exception as e:
+        return None, None, None, None, None, None, f"Error occurred: {str(e)}"
+
+
+def _csv_list(value):
+    return [item.strip() for item in value.split(",") if item.strip()]
+
+
+def _indices(value):
+    return [int(item) for item in _csv_list(value)]
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Scrape tables, headlines, links, images and media from a list of URLs.")
+    parser.add_argument("urls", help="file with one URL per line, or - for stdin")
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--output", help="directory to write one folder of files per page into")
+    target.add_argument("--sqlite", help="SQLite database to write all pages into")
+    parser.add_argument("--format", choices=FORMAT_NAMES, default="csv", help="file format used with --output")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY, help="URLs scraped at the same time")
+    parser.add_argument("--headlines", type=_csv_list, default=[], help="comma-separated headline tags, e.g. h1,h2")
+    parser.add_argument("--links", action="store_true", help="scrape links")
+    parser.add_argument("--images", action="store_true", help="scrape image URLs")
+    parser.add_argument("--media", action="store_true", help="scrape audio and video URLs")
+    parser.add_argument("--tables", type=_indices, default=[], help="comma-separated 1-based table indices (default: all)")
+    parser.add_argument("--crawl-depth", type=int, default=0, help="follow links this many levels deep")
+    parser.add_argument("--max-pages", type=int, default=50, help="page limit per crawl")
+    parser.add_argument("--discover", action="store_true", help="scrape the new or changed pages listed in each site's sitemaps and feeds")
+    parser.add_argument("--parser", choices=BACKENDS, default=DEFAULT_BACKEND, help="HTML parser backend")
+    parser.add_argument("--mode", choices=["auto", "static", "rendered"], default="auto", help="fetch mode")
+    parser.add_argument("--incremental", action="store_true", help="only emit changes since the last scrape")
+    parser.add_argument("--rate", type=float, default=fetch.RATE, help="requests per second per host")
+    parser.add_argument("--ignore-robots", action="store_true", help="do not apply robots.txt rules")
+    parser.add_argument("--trace-log", default=TRACE_LOG, help="append timing spans of every URL to this JSON-lines file")
+    parser.add_argument("--parse-workers", type=int, default=parse_pool.PARSE_WORKERS, help="processes parsing pages; 0 parses on the fetch threads")
+    args = parser.parse_args(argv)
+    if args.concurrency < 1:
+        parser.error("--concurrency must be at least 1")
+    if args.parse_workers < 0:
+        parser.error("--parse-workers must not be negative")
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    urls = read_urls(args.urls)
+    fetch.configure(pool_size=max(fetch.POOL_SIZE, args.concurrency), rate=args.rate, respect_robots=not args.ignore_robots)
+    parse_pool.configure(workers=args.parse_workers)
+    writer = SqliteWriter(args.sqlite) if args.sqlite else DirectoryWriter(args.output, FORMAT_NAMES[args.format])
+
+    failed = 0
+    jobs = {}
+    executor = ThreadPoolExecutor(max_workers=args.concurrency, thread_name_prefix="scrape")
+    try:
+        futures = {}
+        for url in urls:
+            job = jobs[url] = Job(url)
+            futures[executor.submit(scrape_url, job, url, args)] = url
+        for done, future in enumerate(as_completed(futures), 1):
+            url = futures[future]
+            result = future.result()
+            writer.write(url, result, jobs[url])
+            if args.trace_log:
+                jobs[url].trace.close(args.trace_log)
+            error = result[-1]
+            if error:
+                failed += 1
+                print(f"[{done}/{len(urls)}] {url}: {error}", file=sys.stderr)
+            else:
+                print(f"[{done}/{len(urls)}] {url}: {len(result[0])} tables", file=sys.stderr)
+    except KeyboardInterrupt:
+        for job in jobs.values():
+            job.cancel()
+        executor.shutdown(wait=False, cancel_futures=True)
+        print("Interrupted.", file=sys.stderr)
+        return 130
+    finally:
+        executor.shutdown(wait=True)
+        writer.close()
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,100 @@
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor, wait, FIRST_COMPLETED
+from urllib.parse import urlparse
+from urls import resolve
+
+
+def host_of(url):
+    """Return the lowercased host of the given URL."""
+    return urlparse(url).netloc.lower()
+
+
+def crawl(start_url, fetch_page, max_depth=1, max_pages=50, max_workers=8, per_host=2, same_host=True, ready_at=None):
+    """Crawl outward from start_url, yielding (url, depth, page, error) as pages finish.
+
+    start_url may also be a list of URLs, which are all fetched at depth 0;
+    with same_host links are then followed on the first one's host only.
+    Start URLs are canonicalized like the links found on pages, and pages
+    are yielded under their canonical URL.
+
+    fetch_page(url) is called on a worker thread and must return a
+    (page, links) pair, or a Future of one when the page is handed on to
+    another stage such as a parser process; the worker and the host's slot
+    are freed while that is pending. The frontier is de-duplicated, at most
+    max_workers fetches run at once and no more than per_host of them hit
+    the same host.
+    ready_at(host), when given, returns the time.monotonic() at which the
+    host may be fetched again; hosts that are rate limited are passed over
+    so workers go to hosts that are ready instead of sleeping.
+    Results are yielded on the calling thread, so callers may use Streamlit
+    from inside the loop.
+    """
+    start_urls = [start_url] if isinstance(start_url, str) else start_url
+    start_urls = list(dict.fromkeys(resolve(None, url) or url for url in start_urls))
+    start_host = host_of(start_urls[0]) if start_urls else ""
+    seen = set(start_urls)
+    frontier = {}
+    for url in start_urls:
+        frontier.setdefault(host_of(url), deque()).append((url, 0))
+    in_flight = {}
+    parsing = {}
+    host_load = {}
+    scheduled = len(start_urls)
+
+    def enqueue(links, depth):
+        nonlocal scheduled
+        for link in links:
+            if scheduled >= max_pages:
+                return
+            if link in seen or not link.startswith("http"):
+                continue
+            host = host_of(link)
+            if same_host and host != start_host:
+                continue
+            seen.add(link)
+            frontier.setdefault(host, deque()).append((link, depth))
+            scheduled += 1
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        while frontier or in_flight or parsing:
+            next_ready = None
+            # Round-robin over hosts so one busy host cannot starve the others.
+            for host in list(frontier):
+                queue = frontier[host]
+                if ready_at is not None:
+                    ready = ready_at(host)
+                    if ready > time.monotonic():
+                        next_ready = ready if next_ready is None else min(next_ready, ready)
+                        continue
+                while queue and len(in_flight) < max_workers and host_load.get(host, 0) < per_host:
+                    url, depth = queue.popleft()
+                    future = pool.submit(fetch_page, url)
+                    in_flight[future] = (url, depth, host)
+                    host_load[host] = host_load.get(host, 0) + 1
+                if not queue:
+                    del frontier[host]
+
+            timeout = None if next_ready is None else max(0.0, next_ready - time.monotonic())
+            if not in_flight and not parsing:
+                time.sleep(timeout)
+                continue
+            done, _ = wait([*in_flight, *parsing], timeout=timeout, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future in parsing:
+                    url, depth = parsing.pop(future)
+                else:
+                    url, depth, host = in_flight.pop(future)
+                    host_load[host] -= 1
+                try:
+                    result = future.result()
+                    if isinstance(result, Future):
+                        parsing[result] = (url, depth)
+                        continue
+                    page, links = result
+                except Exception as e:
+                    yield url, depth, None, f"Error occurred: {str(e)}"
+                    continue
+                if depth < max_depth:
+                    enqueue(links, depth + 1)
+                yield url, depth, page, None
@@ -0,0 +1,183 @@
+import re
+import xml.etree.ElementTree as ElementTree
+from collections import deque, namedtuple
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlparse
+from fetch import download, get_politeness, open_stream
+from parsers import parse
+from tracing import span
+from urls import resolve
+
+# Tried when robots.txt names no sitemap.
+SITEMAP_PATHS = ("/sitemap.xml", "/sitemap_index.xml")
+# URLs read as a sitemap or feed themselves instead of as a page of the site.
+XML_SUFFIXES = (".xml", ".xml.gz", ".rss", ".atom")
+FEED_TYPES = ("application/rss+xml", "application/atom+xml")
+# Sitemap and feed files read per discovery, nested indexes included, and pages listed at most.
+MAX_SITEMAPS = 100
+MAX_LISTED = 50000
+
+Listing = namedtuple("Listing", ["url", "lastmod", "is_sitemap"])
+
+# Entry elements of sitemaps, sitemap indexes, RSS and Atom; True for nested sitemaps.
+ENTRY_TAGS = {"url": False, "sitemap": True, "item": False, "entry": False}
+# Date children, most telling first.
+DATE_TAGS = ("lastmod", "updated", "modified", "date", "pubDate", "published")
+# W3C datetime allows a bare year or year and month, which fromisoformat() rejects.
+PARTIAL_DATE_RE = re.compile(r"(\d{4})(?:-(\d{2}))?", re.ASCII)
+
+
+def parse_date(text):
+    """Return a W3C/ISO 8601 or RFC 822 date as a POSIX timestamp, or None."""
+    if not text:
+        return None
+    text = text.strip()
+    partial = PARTIAL_DATE_RE.fullmatch(text)
+    try:
+        if partial:
+            value = datetime(int(partial[1]), int(partial[2] or 1), 1)
+        else:
+            value = datetime.fromisoformat(text)
+    except ValueError:
+        try:
+            value = parsedate_to_datetime(text)
+        except (TypeError, ValueError, IndexError):
+            return None
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+def _local(tag):
+    return tag.rpartition("}")[2] if isinstance(tag, str) else ""
+
+
+def iter_listings(stream):
+    """Yield a Listing for every entry of a sitemap, sitemap index, RSS or Atom feed.
+
+    The XML is parsed incrementally and each entry is removed from the tree
+    once read, so memory stays flat however many URLs the file lists.
+    """
+    # Open elements, so a finished entry can be removed from its parent.
+    open_elements = []
+    for event, element in ElementTree.iterparse(stream, events=("start", "end")):
+        if event == "start":
+            open_elements.append(element)
+            continue
+        open_elements.pop()
+        tag = _local(element.tag)
+        if tag not in ENTRY_TAGS:
+            continue
+        url, dates = None, {}
+        for child in element:
+            name = _local(child.tag)
+            text = (child.text or "").strip()
+            if name in ("loc", "link") and text:
+                url = url or text
+            elif name == "link" and child.get("rel", "alternate") == "alternate" and child.get("href"):
+                # Atom links carry the URL as an attribute.
+                url = url or child.get("href")
+            elif name in DATE_TAGS and text:
+                dates.setdefault(name, text)
+        element.clear()
+        if open_elements:
+            open_elements[-1].remove(element)
+        if url:
+            lastmod = next((parse_date(dates[name]) for name in DATE_TAGS if name in dates), None)
+            yield Listing(url, lastmod, ENTRY_TAGS[tag])
+
+
+def feed_links(url):
+    """Return the RSS and Atom feeds a page links to from its <head>."""
+    feeds = []
+    for element in parse(download(url)).iter_elements(["link"]):
+        href = element.get("href")
+        if element.get("type") in FEED_TYPES and href:
+            feed = resolve(url, href)
+            if feed:
+                feeds.append(feed)
+    return feeds
+
+
+def sources(url):
+    """Return the sitemaps and feeds to read for url, and whether they are only guesses.
+
+    url itself when it is a sitemap or feed, else the sitemaps named in the
+    site's robots.txt; failing that the usual sitemap paths and the feeds
+    the page links to.
+    """
+    parts = urlparse(url)
+    if parts.path.lower().endswith(XML_SUFFIXES):
+        return [url], False
+    sitemaps = get_politeness().robots(url).site_maps()
+    if sitemaps:
+        return sitemaps, False
+    origin = f"{parts.scheme}://{parts.netloc}"
+    try:
+        feeds = feed_links(url)
+    except Exception:
+        feeds = []
+    return [origin + path for path in SITEMAP_PATHS] + feeds, True
+
+
+def discover(url, log=None, max_sitemaps=MAX_SITEMAPS, max_listed=MAX_LISTED):
+    """Return {page URL: lastmod or None} for the pages listed in a site's sitemaps and feeds.
+
+    Sitemap indexes are followed breadth-first up to max_sitemaps files. A
+    page listed more than once keeps its latest lastmod. log(message, level)
+    hears about files that could not be read; missing guessed ones are not
+    warned about.
+    """
+    to_read, guessed = sources(url)
+    queue = deque(to_read)
+    queued = set(to_read)
+    pages = {}
+    read = 0
+    while queue and read < max_sitemaps and len(pages) < max_listed:
+        source = queue.popleft()
+        read += 1
+        try:
+            with span("sitemap", url=source) as attributes, open_stream(source) as stream:
+                listed = 0
+                for listing in iter_listings(stream):
+                    target = resolve(source, listing.url)
+                    if target is None:
+                        continue
+                    if listing.is_sitemap:
+                        if target not in queued:
+                            queued.add(target)
+                            queue.append(target)
+                        continue
+                    listed += 1
+                    if target in pages:
+                        if listing.lastmod is not None and (pages[target] is None or listing.lastmod > pages[target]):
+                            pages[target] = listing.lastmod
+                    elif len(pages) < max_listed:
+                        pages[target] = listing.lastmod
+                attributes["pages"] = listed
+            if log:
+                log(f"Read {source}: {listed} page(s) listed.")
+        except Exception as e:
+            if log:
+                log(f"Could not read {source}: {str(e)}", "info" if guessed else "warning")
+    return pages
+
+
+def schedule(pages, known, max_pages):
+    """Pick the pages to scrape from discovered {url: lastmod}, most recently modified first.
+
+    known maps URLs to the lastmod they had when last scraped. Pages never
+    scraped are new; a known page is only changed when it is listed with a
+    later lastmod. Returns the (url, lastmod) pairs to scrape, at most
+    max_pages, and the number of unchanged pages.
+    """
+    new = []
+    unchanged = 0
+    for url, lastmod in pages.items():
+        if url in known and (lastmod is None or (known[url] is not None and lastmod <= known[url])):
+            unchanged += 1
+            continue
+        new.append((url, lastmod))
+    new.sort(key=lambda page: -page[1] if page[1] is not None else float("inf"))
+    return new[:max_pages], unchanged
@@ -0,0 +1,33 @@
+import streamlit as st
+from cleaning import fingerprint
+from export import export_bytes, export_zip, file_name, mime_type
+
+
+def download_frame(label, df, name, fmt):
+    """Offer a DataFrame for download, serializing it only once the user asks for it."""
+    key = f"export_{name}_{fmt}_{fingerprint(df)}"
+    if st.session_state.get(key) or st.button(f"Prepare {label} ({fmt})", key=f"prepare_{key}"):
+        st.session_state[key] = True
+        st.download_button(
+            label=f"Download {label} ({fmt})",
+            data=export_bytes(df, fmt),
+            file_name=file_name(name, fmt),
+            mime=mime_type(fmt),
+            key=f"download_{key}",
+        )
+
+
+def download_all(artifacts, fmt, name):
+    """Offer every (name, DataFrame) artifact as one zip, built only when asked for."""
+    if not artifacts:
+        return
+    key = f"export_{name}_{fmt}_" + "_".join(fingerprint(df) for _, df in artifacts)
+    if st.session_state.get(key) or st.button(f"Prepare zip of all results ({fmt})", key=f"prepare_{key}"):
+        st.session_state[key] = True
+        st.download_button(
+            label=f"Download all results ({fmt}, zip)",
+            data=export_zip(artifacts, fmt),
+            file_name=f"{name}.zip",
+            mime="application/zip",
+            key=f"download_{key}",
+        )
@@ -0,0 +1,117 @@
+import io
+import zipfile
+from cleaning import fingerprint
+from lru import LRUCache
+
+# name: (file extension, mime type, already compressed)
+FORMATS = {
+    "CSV": (".csv", "text/csv", False),
+    "Parquet": (".parquet", "application/vnd.apache.parquet", True),
+    "Feather": (".feather", "application/octet-stream", True),
+    "Arrow IPC stream": (".arrows", "application/vnd.apache.arrow.stream", True),
+}
+COMPRESSION = "zstd"
+# Serialized exports kept across reruns.
+MAX_CACHED_EXPORTS = 16
+
+_cache = LRUCache(MAX_CACHED_EXPORTS)
+
+
+def arrow_table(df):
+    """Convert a DataFrame to an Arrow table, stringifying object columns Arrow cannot type."""
+    import pyarrow as pa
+
+    columns = {}
+    for name, column in zip(df.columns, range(df.shape[1])):
+        series = df.iloc[:, column]
+        try:
+            columns[str(name)] = pa.array(series, from_pandas=True)
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            # Scraped cells can mix numbers and text in one column.
+            columns[str(name)] = pa.array(series.astype(str).where(series.notna()), from_pandas=True)
+    return pa.table(columns)
+
+
+def write_frame(df, fmt, out):
+    """Serialize df in the given format into the binary file object out."""
+    if fmt == "CSV":
+        df.to_csv(io.TextIOWrapper(out, encoding="utf-8", newline="", write_through=True), index=False)
+        return
+
+    import pyarrow as pa
+    import pyarrow.feather as feather
+    import pyarrow.parquet as pq
+
+    table = arrow_table(df)
+    if fmt == "Parquet":
+        pq.write_table(table, out, compression=COMPRESSION)
+    elif fmt == "Feather":
+        feather.write_feather(table, out, compression=COMPRESSION)
+    elif fmt == "Arrow IPC stream":
+        options = pa.ipc.IpcWriteOptions(compression=COMPRESSION)
+        with pa.ipc.new_stream(out, table.schema, options=options) as writer:
+            writer.write_table(table)
+    else:
+        raise ValueError(f"Unknown export format: {fmt}")
+
+
+def file_name(name, fmt):
+    return name + FORMATS[fmt][0]
+
+
+def mime_type(fmt):
+    return FORMATS[fmt][1]
+
+
+def export_bytes(df, fmt):
+    """Serialize a DataFrame on demand, cached per table content and format."""
+    def serialize():
+        buffer = io.BytesIO()
+        write_frame(df, fmt, _Unclosable(buffer))
+        return buffer.getvalue()
+
+    return _cache.cached((fingerprint(df), fmt), serialize)
+
+
+def export_zip(artifacts, fmt):
+    """Write every (name, DataFrame) artifact into one zip archive and return its bytes.
+
+    Each artifact is serialized straight into its zip member, so only one of
+    them is ever being encoded at a time. Formats that are compressed already
+    are stored rather than deflated again.
+    """
+    artifacts = list(artifacts)
+
+    def build():
+        buffer = io.BytesIO()
+        compress_type = zipfile.ZIP_STORED if FORMATS[fmt][2] else zipfile.ZIP_DEFLATED
+        with zipfile.ZipFile(buffer, "w") as archive:
+            for name, df in artifacts:
+                info = zipfile.ZipInfo(file_name(name, fmt))
+                info.compress_type = compress_type
+                with archive.open(info, "w", force_zip64=True) as member:
+                    write_frame(df, fmt, _Unclosable(member))
+        return buffer.getvalue()
+
+    key = ("zip", fmt, tuple((name, fingerprint(df)) for name, df in artifacts))
+    return _cache.cached(key, build)
+
+
+class _Unclosable(io.RawIOBase):
+    """Write-only view of a binary file that writers may close without closing the file."""
+
+    def __init__(self, raw):
+        self._raw = raw
+        self._written = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._raw.write(data)
+        self._written += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._written
+
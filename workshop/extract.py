@@ -0,0 +1,142 @@
+from tables import table_to_frame
+from tracing import span
+from urls import resolve
+
+
+class TableExtractor:
+    """Collect tables, optionally only the given 1-based indices or a CSS class.
+
+    keep(position, element), when given, is asked before a table is built and
+    can skip it, e.g. because it has not changed since the last scrape.
+    """
+
+    tags = ("table",)
+
+    def __init__(self, table_indices=None, table_class=None, on_table=None, keep=None):
+        self.table_indices = table_indices
+        self.table_class = table_class
+        self.on_table = on_table
+        self.keep = keep
+        self.found = 0
+        self.skipped = 0
+        self.tables = []
+        self.positions = []
+
+    def visit(self, element):
+        if self.table_class and self.table_class not in (element.get("class") or []):
+            return
+        self.found += 1
+        if self.table_indices and self.found not in self.table_indices:
+            return
+        if self.keep and not self.keep(self.found, element):
+            self.skipped += 1
+            return
+        if self.on_table:
+            self.on_table(self.found)
+        with span("table", position=self.found) as attributes:
+            df = table_to_frame(element)
+            if df is not None:
+                attributes["rows"], attributes["columns"] = df.shape
+        if df is not None:
+            self.tables.append(df)
+            self.positions.append(self.found)
+
+    def result(self):
+        return self.tables
+
+
+class HeadlineExtractor:
+    """Collect headline text, grouped in the order the tags were selected."""
+
+    def __init__(self, selected_tags):
+        self.tags = tuple(selected_tags)
+        self.by_tag = {tag: [] for tag in self.tags}
+
+    def visit(self, element):
+        self.by_tag[element.name].append(element.get_text().strip())
+
+    def result(self):
+        return [text for tag in self.tags for text in self.by_tag[tag]]
+
+
+class LinkExtractor:
+    """Collect http(s) hrefs from anchors, resolved against base_url and canonicalized.
+
+    Without a base_url only absolute hrefs are kept.
+    """
+
+    tags = ("a",)
+
+    def __init__(self, base_url=None):
+        self.base_url = base_url
+        self.links = []
+
+    def visit(self, element):
+        href = element.get("href")
+        if href is None:
+            return
+        link = resolve(self.base_url, href)
+        if link is not None:
+            self.links.append(link)
+
+    def result(self):
+        return self.links
+
+
+class SourceExtractor:
+    """Collect the src attribute of the given tags, resolved against base_url when given."""
+
+    def __init__(self, tags, base_url=None):
+        self.tags = tuple(tags)
+        self.base_url = base_url
+        self.sources = []
+
+    def visit(self, element):
+        src = element.get("src")
+        if src is None:
+            return
+        if self.base_url:
+            src = resolve(self.base_url, src)
+            if src is None:
+                return
+        self.sources.append(src)
+
+    def result(self):
+        return self.sources
+
+
+class MetadataExtractor:
+    """Collect the page title and the description and keywords meta tags."""
+
+    tags = ("title", "meta")
+
+    def __init__(self):
+        self.metadata = {}
+
+    def visit(self, element):
+        if element.name == "title":
+            self.metadata.setdefault("title", element.get_text())
+            return
+        name = element.get("name")
+        if name in ("description", "keywords") and name not in self.metadata:
+            self.metadata[name] = element.get("content", f"No {name}")
+
+    def result(self):
+        return {
+            "title": self.metadata.get("title", "No title"),
+            "description": self.metadata.get("description", "No description"),
+            "keywords": self.metadata.get("keywords", "No keywords"),
+        }
+
+
+def run_extractors(document, extractors):
+    """Walk a parsed document once, dispatching each element to the extractors registered for its tag."""
+    dispatch = {}
+    for extractor in extractors:
+        for tag in extractor.tags:
+            dispatch.setdefault(tag, []).append(extractor)
+    with span("extract", extractors=[type(extractor).__name__ for extractor in extractors]):
+        for element in document.iter_elements(frozenset(dispatch)):
+            for extractor in dispatch[element.name]:
+                extractor.visit(element)
+    return [extractor.result() for extractor in extractors]
@@ -0,0 +1,334 @@
+import gzip
+import io
+import os
+import re
+import threading
+from contextlib import contextmanager
+from functools import lru_cache
+from urllib.parse import urlparse
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from http_cache import ResponseCache
+from politeness import Politeness, RobotsDisallowed, THROTTLE_STATUSES
+from tracing import span
+
+# (connect, read) timeouts in seconds.
+TIMEOUT = (5, 30)
+RETRIES = 3
+BACKOFF = 0.5
+POOL_SIZE = 32
+USER_AGENT = "Mozilla/5.0 (compatible; workshop-scraper)"
+# Name that robots.txt rules are matched against.
+ROBOTS_AGENT = "workshop-scraper"
+
+# Persistent response cache; set CACHE_PATH to None to disable it.
+CACHE_PATH = os.environ.get(
+    "SCRAPER_CACHE_PATH", os.path.join(os.path.expanduser("~"), ".cache", "workshop-scraper", "responses.sqlite")
+)
+CACHE_TTL = 300
+CACHE_MAX_BYTES = 512 * 1024 * 1024
+
+# Per-host pace; robots.txt can only make it slower.
+RATE = 2.0
+BURST = 4
+RESPECT_ROBOTS = os.environ.get("SCRAPER_IGNORE_ROBOTS", "") == ""
+
+# Static pages with less visible text than this are assumed to need a browser.
+MIN_TEXT = 200
+
+_session = None
+_session_lock = threading.Lock()
+_response_cache = None
+_politeness = None
+# Remembered fetch mode ("static" or "rendered") per host.
+_host_modes = {}
+
+TAG_RE = re.compile(r"<(script|style|noscript|template)\b.*?</\1\s*>|<[^>]*>", re.I | re.S)
+
+
+def accept_encoding():
+    """Return the Accept-Encoding header, offering brotli only when it can be decoded."""
+    try:
+        import brotli  # noqa: F401
+    except ImportError:
+        try:
+            import brotlicffi  # noqa: F401
+        except ImportError:
+            return "gzip, deflate"
+    return "gzip, deflate, br"
+
+
+def configure(timeout=None, retries=None, backoff=None, pool_size=None, cache_path=False, cache_ttl=None, cache_max_bytes=None,
+              rate=None, burst=None, respect_robots=None):
+    """Change the fetch settings; the shared session, cache and host limits are rebuilt on next use."""
+    global TIMEOUT, RETRIES, BACKOFF, POOL_SIZE, CACHE_PATH, CACHE_TTL, CACHE_MAX_BYTES, RATE, BURST, RESPECT_ROBOTS
+    global _session, _response_cache, _politeness
+    with _session_lock:
+        if timeout is not None:
+            TIMEOUT = timeout
+        if retries is not None:
+            RETRIES = retries
+        if backoff is not None:
+            BACKOFF = backoff
+        if pool_size is not None:
+            POOL_SIZE = pool_size
+        if cache_path is not False:
+            CACHE_PATH = cache_path
+        if cache_ttl is not None:
+            CACHE_TTL = cache_ttl
+        if cache_max_bytes is not None:
+            CACHE_MAX_BYTES = cache_max_bytes
+        if rate is not None:
+            RATE = rate
+        if burst is not None:
+            BURST = burst
+        if respect_robots is not None:
+            RESPECT_ROBOTS = respect_robots
+        _response_cache = None
+        _politeness = None
+        if _session is not None:
+            _session.close()
+        _session = None
+
+
+def get_session():
+    """Return the process-wide pooled session, creating it on first use."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            retry = Retry(
+                total=RETRIES,
+                backoff_factor=BACKOFF,
+                # 429 and 503 are retried by download() so the host limiter sees them;
+                # urllib3 would otherwise still retry them whenever Retry-After is set.
+                status_forcelist=(500, 502, 504),
+                allowed_methods=("GET", "HEAD"),
+                raise_on_status=False,
+                respect_retry_after_header=False,
+            )
+            adapter = HTTPAdapter(pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE, max_retries=retry)
+            session = requests.Session()
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            session.headers.update({"User-Agent": USER_AGENT, "Accept-Encoding": accept_encoding()})
+            _session = session
+        return _session
+
+
+def get_response_cache():
+    """Return the persistent response cache, or None when caching is disabled."""
+    global _response_cache
+    with _session_lock:
+        if _response_cache is None and CACHE_PATH:
+            _response_cache = ResponseCache(CACHE_PATH, ttl=CACHE_TTL, max_bytes=CACHE_MAX_BYTES)
+        return _response_cache
+
+
+def _fetch_robots(url):
+    with span("robots", url=url) as attributes:
+        response = get_session().get(url, timeout=TIMEOUT)
+        attributes["status"] = response.status_code
+        attributes["bytes"] = len(response.content)
+    return response.status_code, response.text
+
+
+def get_politeness():
+    """Return the process-wide robots.txt cache and per-host rate limiter."""
+    global _politeness
+    with _session_lock:
+        if _politeness is None:
+            _politeness = Politeness(_fetch_robots, rate=RATE, burst=BURST, respect_robots=RESPECT_ROBOTS, user_agent=ROBOTS_AGENT)
+        return _politeness
+
+
+def download(url):
+    """Download the given URL over the shared session and return its text.
+
+    Fresh cached copies are returned without touching the network; stale ones
+    are revalidated with If-None-Match/If-Modified-Since. Requests wait for
+    the host's rate limit, and 429/503 answers are retried after the pause
+    the host asked for. 4xx/5xx answers raise requests.HTTPError.
+
+    Traced as a "fetch" span with "fetch.wait" (rate limit), "fetch.headers"
+    (connection setup, DNS/TLS included, and server time) and "fetch.body"
+    children.
+    """
+    with span("fetch", url=url) as attributes:
+        return _download(url, attributes)
+
+
+def _download(url, attributes):
+    cache = get_response_cache()
+    entry = cache.lookup(url) if cache else None
+    if entry and cache.is_fresh(entry):
+        attributes["cache"] = "hit"
+        return entry.text
+
+    politeness = get_politeness()
+    if not politeness.allowed(url):
+        raise RobotsDisallowed(f"{url} is disallowed by robots.txt")
+    headers = {}
+    if entry and entry.etag:
+        headers["If-None-Match"] = entry.etag
+    if entry and entry.last_modified:
+        headers["If-Modified-Since"] = entry.last_modified
+    for attempt in range(RETRIES + 1):
+        with span("fetch.wait"):
+            politeness.wait(url)
+        with span("fetch.headers"):
+            response = get_session().get(url, headers=headers, timeout=TIMEOUT, stream=True)
+        with span("fetch.body") as body:
+            body["bytes"] = len(response.content)
+            body["wire_bytes"] = response.raw.tell()
+        politeness.record(url, response.status_code, response.headers)
+        if response.status_code not in THROTTLE_STATUSES:
+            break
+    attributes["status"] = response.status_code
+    attributes["attempts"] = attempt + 1
+    # Error pages, including answers still throttled after every attempt, are not the page asked for.
+    response.raise_for_status()
+    if response.status_code == 304 and entry:
+        attributes["cache"] = "revalidated"
+        cache.refresh(url)
+        return entry.text
+
+    attributes["cache"] = "miss"
+    attributes["bytes"] = len(response.content)
+    text = response.text
+    if cache and response.status_code == 200 and "no-store" not in response.headers.get("Cache-Control", ""):
+        cache.store(url, text, response.headers.get("ETag"), response.headers.get("Last-Modified"))
+    return text
+
+
+@contextmanager
+def open_stream(url):
+    """Open the given URL and yield its body as a binary stream, read as it arrives.
+
+    For bodies that are parsed incrementally, such as large sitemaps; they
+    go through robots.txt and the host's rate limit but not the response
+    cache. Gzip files (sitemap.xml.gz) are decompressed.
+    """
+    with span("fetch.stream", url=url) as attributes:
+        politeness = get_politeness()
+        if not politeness.allowed(url):
+            raise RobotsDisallowed(f"{url} is disallowed by robots.txt")
+        with span("fetch.wait"):
+            politeness.wait(url)
+        response = get_session().get(url, timeout=TIMEOUT, stream=True)
+        try:
+            politeness.record(url, response.status_code, response.headers)
+            attributes["status"] = response.status_code
+            response.raise_for_status()
+            response.raw.decode_content = True
+            # Reads past the end must see EOF, not a closed file.
+            response.raw.auto_close = False
+            body = io.BufferedReader(response.raw)
+            yield gzip.GzipFile(fileobj=body) if body.peek(2)[:2] == b"\x1f\x8b" else body
+            attributes["wire_bytes"] = response.raw.tell()
+        finally:
+            response.close()
+
+
+class FetchCache:
+    """Per-run cache that makes sure every URL is loaded only once."""
+
+    def __init__(self):
+        self._pages = {}
+        self._locks = {}
+        self._lock = threading.Lock()
+
+    def get(self, url, loader=download):
+        key = (loader, url)
+        with self._lock:
+            if key in self._pages:
+                return self._pages[key]
+            url_lock = self._locks.setdefault(key, threading.Lock())
+        # Concurrent callers asking for the same URL wait for the first download.
+        with url_lock:
+            with self._lock:
+                if key in self._pages:
+                    return self._pages[key]
+            text = loader(url)
+            with self._lock:
+                self._pages[key] = text
+                del self._locks[key]
+        return text
+
+
+def fetch_text(url, cache=None, loader=download):
+    """Load the given URL with loader, going through cache when one is given."""
+    if cache is None:
+        return loader(url)
+    return cache.get(url, loader)
+
+
+@lru_cache(maxsize=None)
+def render_loader(ready_selector=None):
+    """Return a loader that renders pages in the browser pool.
+
+    Loaders are memoized per selector so that a FetchCache sees the same
+    loader, and therefore the same cache key, on every call.
+    """
+    def render_page(url):
+        with span("render", url=url) as attributes:
+            from browser import render
+
+            politeness = get_politeness()
+            if not politeness.allowed(url):
+                raise RobotsDisallowed(f"{url} is disallowed by robots.txt")
+            with span("fetch.wait"):
+                politeness.wait(url)
+            html = render(url, ready_selector=ready_selector)
+            attributes["bytes"] = len(html)
+            return html
+
+    return render_page
+
+
+def has_content(html, ready_selector=None, min_text=MIN_TEXT):
+    """Cheaply check raw HTML for the wanted content without parsing it.
+
+    ready_selector may be "tag" or "tag.class"; without one the page must
+    have at least min_text characters of visible text.
+    """
+    if ready_selector:
+        tag, _, css_class = ready_selector.partition(".")
+        pattern = rf"<{re.escape(tag)}\b[^>]*"
+        if css_class:
+            pattern += rf"""class\s*=\s*["']?[^"'>]*(?<![\w-]){re.escape(css_class)}(?![\w-])"""
+        return re.search(pattern, html, re.I) is not None
+    text = TAG_RE.sub(" ", html)
+    return len("".join(text.split())) >= min_text
+
+
+def fetch_html(url, cache=None, mode="auto", ready_selector=None, min_text=MIN_TEXT):
+    """Fetch a page statically or in a browser, whichever it needs.
+
+    mode is "static", "rendered" or "auto". In auto mode the cheap static
+    fetch is tried first and the browser is only used when the static DOM
+    lacks the wanted content; the outcome is remembered per host so later
+    pages from the same site skip the probe. HTTP errors of the static
+    fetch are raised rather than sent to the browser, so a broken link
+    cannot switch its host to rendering.
+    """
+    host = urlparse(url).netloc.lower()
+    if mode == "auto":
+        mode = _host_modes.get(host, "auto")
+    if mode == "rendered":
+        return fetch_text(url, cache, loader=render_loader(ready_selector))
+
+    html = fetch_text(url, cache)
+    if mode == "static":
+        return html
+    if has_content(html, ready_selector, min_text):
+        _host_modes[host] = "static"
+        return html
+    try:
+        rendered = fetch_text(url, cache, loader=render_loader(ready_selector))
+    except Exception:
+        # No usable browser; the static page is still better than nothing.
+        _host_modes[host] = "static"
+        return html
+    _host_modes[host] = "rendered"
+    return rendered
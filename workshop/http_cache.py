@@ -0,0 +1,93 @@
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from collections import namedtuple
+
+CacheEntry = namedtuple("CacheEntry", ["url", "text", "etag", "last_modified", "fetched_at"])
+
+
+class ResponseCache:
+    """SQLite-backed response cache with a TTL and a size-bounded LRU.
+
+    Bodies are stored zlib-compressed together with the ETag and
+    Last-Modified validators so that stale entries can be revalidated with a
+    conditional request instead of being downloaded again.
+    """
+
+    def __init__(self, path, ttl=300, max_bytes=512 * 1024 * 1024):
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS responses (
+                url TEXT PRIMARY KEY,
+                body BLOB NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                fetched_at REAL NOT NULL,
+                accessed_at REAL NOT NULL,
+                size INTEGER NOT NULL
+            )"""
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed_at)")
+        self._conn.commit()
+
+    def lookup(self, url):
+        """Return the cached entry for url, or None."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT body, etag, last_modified, fetched_at FROM responses WHERE url = ?", (url,)
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute("UPDATE responses SET accessed_at = ? WHERE url = ?", (time.time(), url))
+            self._conn.commit()
+        body, etag, last_modified, fetched_at = row
+        return CacheEntry(url, zlib.decompress(body).decode("utf-8"), etag, last_modified, fetched_at)
+
+    def is_fresh(self, entry):
+        """Whether entry is young enough to be used without revalidation."""
+        return time.time() - entry.fetched_at < self.ttl
+
+    def store(self, url, text, etag=None, last_modified=None):
+        """Store a response body and its validators, then evict down to max_bytes."""
+        body = zlib.compress(text.encode("utf-8"), 1)
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (url, body, etag, last_modified, now, now, len(body)),
+            )
+            self._evict()
+            self._conn.commit()
+
+    def refresh(self, url):
+        """Mark an entry as just revalidated, e.g. after a 304 response."""
+        now = time.time()
+        with self._lock:
+            self._conn.execute("UPDATE responses SET fetched_at = ?, accessed_at = ? WHERE url = ?", (now, now, url))
+            self._conn.commit()
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._conn.commit()
+
+    def _evict(self):
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        rows = self._conn.execute("SELECT url, size FROM responses ORDER BY accessed_at").fetchall()
+        for url, size in rows:
+            if total <= self.max_bytes:
+                break
+            self._conn.execute("DELETE FROM responses WHERE url = ?", (url,))
+            total -= size
@@ -0,0 +1,120 @@
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from tracing import Trace, tracing
+
+MAX_WORKERS = 4
+# Finished jobs kept around for sessions that have not picked up their results yet.
+MAX_FINISHED_JOBS = 50
+
+
+class JobCancelled(Exception):
+    """Raised inside a job that noticed it was cancelled."""
+
+
+class Job:
+    """A unit of background work with progress counters, log messages and cancellation."""
+
+    def __init__(self, description=""):
+        self.id = uuid.uuid4().hex[:12]
+        self.description = description
+        self.status = "queued"
+        self.progress = {}
+        self.messages = []
+        self.result = None
+        # Named side outputs, e.g. the link graph of a scrape.
+        self.artifacts = {}
+        # Timing spans of the work, see tracing.py.
+        self.trace = Trace(description)
+        self.error = None
+        self.created_at = time.time()
+        self.finished_at = None
+        self._cancel = threading.Event()
+        self._lock = threading.Lock()
+
+    def advance(self, counter, amount=1):
+        """Increase a progress counter such as "pages" or "tables"."""
+        with self._lock:
+            self.progress[counter] = self.progress.get(counter, 0) + amount
+
+    def log(self, message, level="info"):
+        with self._lock:
+            self.messages.append((level, message))
+
+    def warn(self, message):
+        self.log(message, "warning")
+
+    def cancel(self):
+        self._cancel.set()
+
+    @property
+    def cancelled(self):
+        return self._cancel.is_set()
+
+    def check_cancelled(self):
+        """Raise JobCancelled if cancellation was requested."""
+        if self._cancel.is_set():
+            raise JobCancelled()
+
+    @property
+    def finished(self):
+        return self.status in ("done", "failed", "cancelled")
+
+
+class JobRunner:
+    """Runs jobs on a shared thread pool and keeps them addressable by id."""
+
+    def __init__(self, max_workers=MAX_WORKERS):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="job")
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+
+    def submit(self, fn, *args, description="", **kwargs):
+        """Run fn(job, *args, **kwargs) in the background and return the job."""
+        job = Job(description)
+        with self._lock:
+            self._jobs[job.id] = job
+            self._prune()
+        self._executor.submit(self._run, job, fn, args, kwargs)
+        return job
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def _run(self, job, fn, args, kwargs):
+        if job.cancelled:
+            job.status = "cancelled"
+        else:
+            job.status = "running"
+            try:
+                with tracing(job.trace):
+                    job.result = fn(job, *args, **kwargs)
+                job.status = "cancelled" if job.cancelled else "done"
+            except JobCancelled:
+                job.status = "cancelled"
+            except Exception as e:
+                job.error = f"Error occurred: {str(e)}"
+                job.status = "failed"
+        job.finished_at = time.time()
+        job.trace.close()
+
+    def _prune(self):
+        finished = [job_id for job_id, job in self._jobs.items() if job.finished]
+        for job_id in finished[:max(0, len(finished) - MAX_FINISHED_JOBS)]:
+            del self._jobs[job_id]
+
+
+_runner = None
+_runner_lock = threading.Lock()
+
+
+def get_runner():
+    """Return the process-wide job runner shared by all sessions."""
+    global _runner
+    with _runner_lock:
+        if _runner is None:
+            _runner = JobRunner()
+        return _runner
@@ -0,0 +1,115 @@
+import sys
+import threading
+from array import array
+import numpy as np
+import pandas as pd
+from urls import host_of, hosts_of
+
+
+class LinkGraph:
+    """Compact source -> target link graph.
+
+    Every URL and host is stored once and edges are two int32 arrays of URL
+    ids, so millions of edges cost a few bytes each instead of a pair of
+    Python strings.
+    """
+
+    def __init__(self):
+        self.urls = []
+        self.hosts = []
+        self._url_ids = {}
+        self._host_ids = {}
+        self._url_hosts = array("i")
+        self._sources = array("i")
+        self._targets = array("i")
+        self._lock = threading.Lock()
+
+    def _url_id(self, url):
+        url_id = self._url_ids.get(url)
+        if url_id is None:
+            # Interned, so the graph and the scraped link lists share one string per URL.
+            url = sys.intern(url)
+            url_id = self._url_ids[url] = len(self.urls)
+            self.urls.append(url)
+            # The same hosts as domain_frequency() counts.
+            host = sys.intern(host_of(url))
+            host_id = self._host_ids.get(host)
+            if host_id is None:
+                host_id = self._host_ids[host] = len(self.hosts)
+                self.hosts.append(host)
+            self._url_hosts.append(host_id)
+        return url_id
+
+    def add_links(self, source, targets):
+        """Record an edge from source to each of the (canonical) target URLs."""
+        with self._lock:
+            ids, url_id = self._url_ids, self._url_id
+            target_ids = array("i", [ids[url] if url in ids else url_id(url) for url in targets])
+            self._sources.extend(array("i", [url_id(source)]) * len(target_ids))
+            self._targets.extend(target_ids)
+
+    def __len__(self):
+        return len(self._sources)
+
+    def __getstate__(self):
+        # The lock cannot be pickled, e.g. when the result store spills a graph to disk.
+        with self._lock:
+            state = self.__dict__.copy()
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    @property
+    def nbytes(self):
+        """Approximate memory held by the graph."""
+        with self._lock:
+            strings = sum(sys.getsizeof(url) for url in self.urls) + sum(sys.getsizeof(host) for host in self.hosts)
+            ids = sys.getsizeof(self._url_ids) + sys.getsizeof(self._host_ids)
+            arrays = sum(len(codes) * codes.itemsize for codes in (self._url_hosts, self._sources, self._targets))
+            return strings + ids + arrays
+
+    def _codes(self):
+        with self._lock:
+            return (
+                np.frombuffer(self._sources, dtype=np.int32).copy(),
+                np.frombuffer(self._targets, dtype=np.int32).copy(),
+                np.frombuffer(self._url_hosts, dtype=np.int32).copy(),
+                list(self.urls),
+                list(self.hosts),
+            )
+
+    def edges(self):
+        """Return the edges as a DataFrame with categorical source and target columns."""
+        sources, targets, _, urls, _ = self._codes()
+        categories = pd.Index(urls)
+        return pd.DataFrame({
+            "source": pd.Categorical.from_codes(sources, categories=categories),
+            "target": pd.Categorical.from_codes(targets, categories=categories),
+        })
+
+    def host_frequency(self):
+        """Return how many edges point to each host, most linked first."""
+        _, targets, url_hosts, _, hosts = self._codes()
+        counts = np.bincount(url_hosts[targets], minlength=len(hosts))
+        return pd.Series(counts, index=pd.Index(hosts, name="host")).sort_values(ascending=False).loc[lambda s: s > 0]
+
+    def in_degree(self):
+        """Return how many edges point to each URL, most linked first."""
+        _, targets, _, urls, _ = self._codes()
+        counts = np.bincount(targets, minlength=len(urls))
+        return pd.Series(counts, index=pd.Index(urls, name="url")).sort_values(ascending=False).loc[lambda s: s > 0]
+
+
+def domain_frequency(links):
+    """Count the links per host for a list of URLs.
+
+    The URLs are factorized first, so the host regex only runs once per
+    distinct URL and the counts are summed per host with NumPy.
+    """
+    codes, uniques = pd.factorize(pd.Series(links, dtype=object))
+    hosts = hosts_of(pd.Series(uniques, dtype=object))
+    counts = pd.Series(np.bincount(codes[codes >= 0], minlength=len(uniques)))
+    return counts.groupby(hosts.values).sum().sort_values(ascending=False).rename_axis("host")
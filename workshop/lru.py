@@ -0,0 +1,55 @@
+import threading
+import time
+from collections import OrderedDict
+
+_MISSING = object()
+
+
+class LRUCache:
+    """Thread-safe cache that keeps the max_entries most recently used values.
+
+    With ttl, values stored more than ttl seconds ago count as missing.
+    """
+
+    def __init__(self, max_entries, ttl=None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        # key -> (time stored, value)
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        """Return the value stored under key, or default."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or (self.ttl is not None and time.monotonic() - entry[0] > self.ttl):
+                return default
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def put(self, key, value):
+        """Store value under key, dropping the least recently used values over the limit."""
+        with self._lock:
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def cached(self, key, compute):
+        """Return the value stored under key, calling compute() to fill it in when missing.
+
+        compute runs outside the lock, so two threads missing the same key
+        may both compute it; the last one to finish is kept.
+        """
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
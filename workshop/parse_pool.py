@@ -0,0 +1,168 @@
+import io
+import multiprocessing
+import os
+import sys
+import threading
+import types
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from export import write_frame
+from extract import TableExtractor, HeadlineExtractor, LinkExtractor, SourceExtractor, MetadataExtractor, run_extractors
+from parsers import parse
+from snapshots import changed_tables
+from tracing import Trace, span, tracing
+
+# Parser processes; 0 parses on the fetching thread instead, which is also
+# the default on a single CPU where worker processes only add overhead.
+CPUS = os.cpu_count() or 1
+PARSE_WORKERS = int(os.environ.get("SCRAPER_PARSE_WORKERS", CPUS if CPUS > 1 else 0))
+# Fetched pages allowed to wait for a parser, per worker; fetching blocks beyond that.
+PENDING_PER_WORKER = 2
+# Workers are started fresh rather than forked from a process full of threads.
+START_METHOD = "spawn"
+
+ParsedPage = namedtuple(
+    "ParsedPage",
+    ["links", "tables", "positions", "table_hashes", "found", "skipped", "headlines", "page_links", "images", "media_files", "metadata", "spans"],
+)
+
+
+def frame_to_ipc(df):
+    """Serialize a DataFrame as an Arrow IPC stream."""
+    with span("ipc.write", rows=len(df)) as attributes:
+        out = io.BytesIO()
+        write_frame(df, "Arrow IPC stream", out)
+        attributes["bytes"] = out.tell()
+    return out.getvalue()
+
+
+def frame_from_ipc(data):
+    import pyarrow as pa
+
+    with span("ipc.read", bytes=len(data)):
+        return pa.ipc.open_stream(data).read_pandas()
+
+
+def parse_page(html, url, parser, headline_tags, scrape_links, scrape_images, scrape_media, table_indices, previous_tables=None):
+    """Parse a page and run the extractors over it; runs in a parser process.
+
+    Tables come back as Arrow IPC streams rather than pickled DataFrames,
+    and nothing of the parsed document leaves the process. previous_tables,
+    the table hashes of the last incremental scrape, skips unchanged tables.
+    The worker's spans come back in ParsedPage.spans.
+    """
+    trace = Trace(url)
+    with tracing(trace), span("parse_page", url=url, pid=os.getpid()):
+        page = _parse_page(html, url, parser, headline_tags, scrape_links, scrape_images, scrape_media, table_indices, previous_tables)
+    return page._replace(spans=trace.spans)
+
+
+def _parse_page(html, url, parser, headline_tags, scrape_links, scrape_images, scrape_media, table_indices, previous_tables):
+    hashes = {}
+    keep = changed_tables(previous_tables, hashes) if previous_tables is not None else None
+    tables = TableExtractor(table_indices, keep=keep)
+    metadata = MetadataExtractor()
+    headlines = HeadlineExtractor(headline_tags)
+    # Always run: a crawl follows the links even when they are not scraped.
+    links = LinkExtractor(url)
+    images = SourceExtractor(["img"], url)
+    media_files = SourceExtractor(["audio", "video", "source"], url)
+
+    extractors = [tables, metadata, headlines, links]
+    if scrape_images:
+        extractors.append(images)
+    if scrape_media:
+        extractors.append(media_files)
+    run_extractors(parse(html, parser), extractors)
+
+    return ParsedPage(
+        set(links.result()),
+        [frame_to_ipc(df) for df in tables.result()],
+        tables.positions,
+        hashes,
+        tables.found,
+        tables.skipped,
+        headlines.result(),
+        links.result() if scrape_links else [],
+        images.result(),
+        media_files.result(),
+        metadata.result(),
+        [],
+    )
+
+
+class ParsePool:
+    """Process pool running parse_page, with back-pressure towards the fetchers.
+
+    submit() blocks while max_pending pages are queued or being parsed, so
+    fetch threads stop pulling pages faster than the parsers can take them.
+    """
+
+    def __init__(self, workers=PARSE_WORKERS, max_pending=None):
+        self.workers = workers
+        self.max_pending = max_pending or workers * PENDING_PER_WORKER
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+        self._lock = threading.Lock()
+        self._executor = self._start()
+
+    def _start(self):
+        executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context(START_METHOD))
+        # Spawned workers re-run the parent's __main__, which under Streamlit is
+        # the app script. Start them all now with a bare __main__ instead; they
+        # take far longer to boot than this loop, so every task gets a new one.
+        main = sys.modules["__main__"]
+        sys.modules["__main__"] = types.ModuleType("__main__")
+        try:
+            for _ in range(self.workers):
+                executor.submit(os.getpid)
+        finally:
+            sys.modules["__main__"] = main
+        return executor
+
+    def submit(self, html, url, *options):
+        """Queue a page for parse_page and return its future."""
+        self._slots.acquire()
+        executor = self._executor
+        try:
+            try:
+                future = executor.submit(parse_page, html, url, *options)
+            except BrokenProcessPool:
+                # A worker died, e.g. out of memory; carry on with a fresh pool.
+                with self._lock:
+                    if self._executor is executor:
+                        executor.shutdown(wait=False)
+                        self._executor = self._start()
+                future = self._executor.submit(parse_page, html, url, *options)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+    def shutdown(self):
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def configure(workers=None):
+    """Change the number of parser processes; the pool is restarted on next use."""
+    global PARSE_WORKERS, _pool
+    with _pool_lock:
+        if workers is not None:
+            PARSE_WORKERS = workers
+        if _pool is not None:
+            _pool.shutdown()
+        _pool = None
+
+
+def get_parse_pool():
+    """Return the process-wide parse pool, or None when PARSE_WORKERS is 0."""
+    global _pool
+    with _pool_lock:
+        if _pool is None and PARSE_WORKERS > 0:
+            _pool = ParsePool(PARSE_WORKERS)
+        return _pool
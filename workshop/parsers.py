@@ -0,0 +1,192 @@
+import os
+from tracing import span
+
+# Backends in order of preference; only the ones whose library imports are offered.
+BACKENDS = ("lxml", "selectolax", "html.parser")
+DEFAULT_BACKEND = os.environ.get("SCRAPER_PARSER", "lxml")
+
+
+def available_backends():
+    """Return the parser backends that can be used in this environment."""
+    available = []
+    for backend in BACKENDS:
+        try:
+            if backend == "lxml":
+                import lxml.html  # noqa: F401
+            elif backend == "selectolax":
+                import selectolax.lexbor  # noqa: F401
+        except ImportError:
+            continue
+        available.append(backend)
+    return available
+
+
+def parse(html, backend=None):
+    """Parse html with the given backend and return a document for the extraction engine.
+
+    Documents yield elements that support the subset of the bs4 Tag API the
+    extractors rely on: name, get(), get_text() and find_all().
+    """
+    backend = backend or DEFAULT_BACKEND
+    if backend not in available_backends():
+        backend = "html.parser"
+    with span("parse", parser=backend, bytes=len(html)):
+        if backend == "lxml":
+            return LxmlDocument(html)
+        if backend == "selectolax":
+            return SelectolaxDocument(html)
+        return SoupDocument(html)
+
+
+def table_rows(table):
+    """Yield each row of a table as a list of (tag, text, colspan, rowspan) cell tuples.
+
+    The backend elements produce these natively so that large tables do not
+    pay for one adapter object per cell.
+    """
+    if isinstance(table, (LxmlElement, SelectolaxElement)):
+        yield from table.table_rows()
+        return
+    for row in table.find_all("tr"):
+        yield [
+            (cell.name, cell.get_text().strip(), cell.get("colspan"), cell.get("rowspan"))
+            for cell in row.find_all(["th", "td"])
+        ]
+
+
+def row_count(table):
+    """Return the number of rows table_rows() will yield."""
+    if isinstance(table, (LxmlElement, SelectolaxElement)):
+        return table.row_count()
+    return len(table.find_all("tr"))
+
+
+class SoupDocument:
+    """BeautifulSoup with the standard library html.parser."""
+
+    def __init__(self, html):
+        # Imported on first use: bs4 is only needed for this fallback backend.
+        from bs4 import BeautifulSoup
+
+        self.soup = BeautifulSoup(html, "html.parser")
+
+    def iter_elements(self, tags):
+        from bs4 import Tag
+
+        for element in self.soup.descendants:
+            if isinstance(element, Tag) and element.name in tags:
+                yield element
+
+
+class LxmlElement:
+    __slots__ = ("_element",)
+
+    def __init__(self, element):
+        self._element = element
+
+    @property
+    def name(self):
+        return self._element.tag
+
+    def get(self, key, default=None):
+        value = self._element.get(key, default)
+        if key == "class" and value is not None:
+            return value.split()
+        return value
+
+    def get_text(self):
+        return self._element.text_content()
+
+    def find_all(self, names):
+        if isinstance(names, str):
+            names = (names,)
+        return [LxmlElement(element) for element in self._element.iterdescendants(*names)]
+
+    def table_rows(self):
+        for row in self._element.iterdescendants("tr"):
+            yield [
+                (cell.tag, cell.text_content().strip(), cell.get("colspan"), cell.get("rowspan"))
+                for cell in row.iterdescendants("th", "td")
+            ]
+
+    def row_count(self):
+        return int(self._element.xpath("count(.//tr)"))
+
+
+class LxmlDocument:
+    """lxml's libxml2 HTML parser."""
+
+    def __init__(self, html):
+        import lxml.html
+        from lxml.etree import ParserError
+
+        if isinstance(html, str):
+            html = html.encode("utf-8")
+        try:
+            self.root = lxml.html.document_fromstring(html, parser=lxml.html.HTMLParser(encoding="utf-8"))
+        except ParserError:
+            # Raised for empty documents.
+            self.root = None
+
+    def iter_elements(self, tags):
+        if self.root is None:
+            return
+        for element in self.root.iter(*tags):
+            yield LxmlElement(element)
+
+
+class SelectolaxElement:
+    __slots__ = ("_node",)
+
+    def __init__(self, node):
+        self._node = node
+
+    @property
+    def name(self):
+        return self._node.tag
+
+    def get(self, key, default=None):
+        attributes = self._node.attributes
+        if key not in attributes:
+            return default
+        value = attributes[key] or ""
+        if key == "class":
+            return value.split()
+        return value
+
+    def get_text(self):
+        return self._node.text(deep=True)
+
+    def find_all(self, names):
+        if isinstance(names, str):
+            names = (names,)
+        nodes = self._node.traverse()
+        next(nodes)  # traverse() starts with the node itself
+        return [SelectolaxElement(node) for node in nodes if node.tag in names]
+
+    def table_rows(self):
+        for row in self._node.css("tr"):
+            cells = []
+            for cell in row.css("th, td"):
+                attributes = cell.attributes
+                cells.append((cell.tag, cell.text(deep=True).strip(), attributes.get("colspan"), attributes.get("rowspan")))
+            yield cells
+
+    def row_count(self):
+        return len(self._node.css("tr"))
+
+
+class SelectolaxDocument:
+    """selectolax's lexbor HTML5 parser."""
+
+    def __init__(self, html):
+        from selectolax.lexbor import LexborHTMLParser
+
+        self.tree = LexborHTMLParser(html)
+
+    def iter_elements(self, tags):
+        if self.tree.root is None:
+            return
+        for node in self.tree.root.traverse():
+            if node.tag in tags:
+                yield SelectolaxElement(node)
@@ -0,0 +1,193 @@
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlparse
+from urllib.robotparser import RobotFileParser
+
+# Steady request rate per host (requests per second) and how many may go out back to back.
+RATE = 2.0
+BURST = 4
+# Rate limiting answers; they slow the host down and are retried after a pause.
+THROTTLE_STATUSES = (429, 503)
+# Pause after a throttling answer without Retry-After, doubled per repeat.
+BACKOFF = 1.0
+MAX_BACKOFF = 300
+# Share of the slowdown that is undone after every successful request.
+RECOVERY = 0.1
+ROBOTS_TTL = 3600
+# A robots.txt answered with a server error or 429 disallows the whole site for this long (RFC 9309).
+ROBOTS_ERROR_TTL = 300
+
+
+class RobotsDisallowed(Exception):
+    """Raised for URLs that the site's robots.txt does not allow us to fetch."""
+
+
+def retry_after(value):
+    """Return the delay in seconds from a Retry-After header, or None."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError, IndexError):
+        return None
+
+
+class HostBucket:
+    """Token bucket for one host, slowed down by throttling answers and sped up again by successes."""
+
+    def __init__(self, rate, burst):
+        self.base_rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.slowdown = 1.0
+        self.blocked_until = 0.0
+        self.strikes = 0
+
+    @property
+    def rate(self):
+        return self.base_rate / self.slowdown
+
+    def _refill(self, now):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def ready_at(self, now):
+        """Return the monotonic time at which the next request may go out."""
+        self._refill(now)
+        ready = now if self.tokens >= 1 else now + (1 - self.tokens) / self.rate
+        return max(ready, self.blocked_until)
+
+    def take(self, now):
+        """Take a token if one is available; otherwise return how long to wait."""
+        ready = self.ready_at(now)
+        if ready > now:
+            return ready - now
+        self.tokens -= 1
+        return 0.0
+
+    def throttled(self, now, delay=None):
+        self.strikes += 1
+        self.slowdown = min(self.slowdown * 2, self.base_rate * MAX_BACKOFF)
+        if delay is None:
+            delay = BACKOFF * 2 ** (self.strikes - 1)
+        self.blocked_until = max(self.blocked_until, now + min(delay, MAX_BACKOFF))
+        self.tokens = 0.0
+
+    def succeeded(self):
+        self.strikes = 0
+        self.slowdown = max(1.0, self.slowdown * (1 - RECOVERY))
+
+
+class Politeness:
+    """Per-host robots.txt rules, rate limits and backoff shared by all fetches.
+
+    fetch_robots(url) must return (status_code, text) for a robots.txt URL.
+    While robots.txt answers with a server error or 429 the site counts as
+    disallowed, and it is asked again after robots_error_ttl seconds; a
+    missing one (other 4xx) or an unreachable host allows everything.
+    A Crawl-delay or Request-rate in robots.txt lowers the host's rate
+    below the default one, never raises it.
+    """
+
+    def __init__(self, fetch_robots, rate=RATE, burst=BURST, respect_robots=True, user_agent="*", robots_ttl=ROBOTS_TTL,
+                 robots_error_ttl=ROBOTS_ERROR_TTL):
+        self.fetch_robots = fetch_robots
+        self.rate = rate
+        self.burst = burst
+        self.respect_robots = respect_robots
+        self.user_agent = user_agent
+        self.robots_ttl = robots_ttl
+        self.robots_error_ttl = robots_error_ttl
+        self._robots = {}
+        self._robots_locks = {}
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def robots(self, url):
+        """Return the parsed robots.txt for the URL's site, fetched at most once per TTL."""
+        parts = urlparse(url)
+        origin = f"{parts.scheme}://{parts.netloc.lower()}"
+        with self._lock:
+            cached = self._robots.get(origin)
+            if cached and time.monotonic() < cached[0]:
+                return cached[1]
+            origin_lock = self._robots_locks.setdefault(origin, threading.Lock())
+        # One fetch per site; concurrent callers wait for it.
+        with origin_lock:
+            with self._lock:
+                cached = self._robots.get(origin)
+                if cached and time.monotonic() < cached[0]:
+                    return cached[1]
+            rules = RobotFileParser(origin + "/robots.txt")
+            ttl = self.robots_ttl
+            try:
+                status, text = self.fetch_robots(origin + "/robots.txt")
+            except Exception:
+                status, text = None, ""
+            if status in (401, 403):
+                rules.disallow_all = True
+            elif status is not None and (status >= 500 or status == 429):
+                # The server could not say what is allowed; assume nothing is, for a while.
+                rules.disallow_all = True
+                ttl = self.robots_error_ttl
+            elif status == 200:
+                rules.parse(text.splitlines())
+            else:
+                # Missing or unreachable robots.txt: everything is allowed.
+                rules.allow_all = True
+            with self._lock:
+                self._robots[origin] = (time.monotonic() + ttl, rules)
+        return rules
+
+    def allowed(self, url):
+        if not self.respect_robots:
+            return True
+        return self.robots(url).can_fetch(self.user_agent, url)
+
+    def _bucket(self, url):
+        host = urlparse(url).netloc.lower()
+        with self._lock:
+            bucket = self._buckets.get(host)
+        if bucket is not None:
+            return bucket
+        rate = self.rate
+        if self.respect_robots:
+            rules = self.robots(url)
+            delay = rules.crawl_delay(self.user_agent)
+            if delay:
+                rate = min(rate, 1 / float(delay))
+            request_rate = rules.request_rate(self.user_agent)
+            if request_rate and request_rate.requests and request_rate.seconds:
+                rate = min(rate, request_rate.requests / request_rate.seconds)
+        with self._lock:
+            return self._buckets.setdefault(host, HostBucket(rate, self.burst if rate == self.rate else 1))
+
+    def ready_at(self, host):
+        """Return the monotonic time at which host may be fetched again."""
+        with self._lock:
+            bucket = self._buckets.get(host)
+            return bucket.ready_at(time.monotonic()) if bucket else 0.0
+
+    def wait(self, url):
+        """Block until the URL's host may be sent another request."""
+        bucket = self._bucket(url)
+        while True:
+            with self._lock:
+                delay = bucket.take(time.monotonic())
+            if not delay:
+                return
+            time.sleep(delay)
+
+    def record(self, url, status, headers=None):
+        """Adapt the host's pace to a response status and its Retry-After header."""
+        bucket = self._bucket(url)
+        with self._lock:
+            if status in THROTTLE_STATUSES:
+                bucket.throttled(time.monotonic(), retry_after((headers or {}).get("Retry-After")))
+            elif status < 400:
+                bucket.succeeded()
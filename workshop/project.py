@@ -1,10 +1,16 @@
 import streamlit as st
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from webdriver_manager.chrome import ChromeDriverManager
-from bs4 import BeautifulSoup
-import pandas as pd
-import time
+from fetch import FetchCache, fetch_html
+from parsers import parse
+from extract import TableExtractor, HeadlineExtractor, LinkExtractor, run_extractors
+from cleaning import list_frame
+from viewer import show_frame
+from downloads import download_frame
+from tracing import Trace, span, tracing
+from trace_panel import show_trace
+from results import get_result_store
+
+# Parts of a scrape result, in the order scrape_wikipedia_data returns them.
+RESULT_PARTS = ["table_data", "headlines", "links", "error"]
 
 # Custom CSS for grey gradient background and button alignment
 st.markdown(
@@ -26,60 +32,38 @@ st.markdown(
     unsafe_allow_html=True
 )
 
-def scrape_wikipedia_data(url, scrape_headlines, selected_headlines_tags, scrape_links):
-    options = webdriver.ChromeOptions()
-    options.add_argument("--headless")  
-    options.add_argument("--disable-gpu")
-    options.add_argument("--no-sandbox")
-    driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=options)
-
+def scrape_wikipedia_data(url, scrape_headlines, selected_headlines_tags, scrape_links, cache=None, parser=None):
     try:
-        driver.get(url)
-        time.sleep(2)
-
-        soup = BeautifulSoup(driver.page_source, "html.parser")
-        driver.quit()
-
-        tables = soup.find_all("table", {"class": "wikitable"})
-        all_table_data = []
-        if tables:
-            for i, table in enumerate(tables, 1):
-                st.write(f"Scraping Table {i}...")
-                rows = table.find_all("tr")
-                headers = [th.text.strip() for th in rows[0].find_all("th")]
-
-                data = []
-                for row in rows[1:]:
-                    cols = row.find_all(["th", "td"])
-                    cols = [col.text.strip() for col in cols]
-                    
-                    while len(cols) < len(headers):
-                        cols.append("")  
-                    if len(cols) > len(headers):
-                        cols = cols[:len(headers)]  
-                    data.append(cols)
-
-                df = pd.DataFrame(data, columns=headers)
-                all_table_data.append(df)
-        else:
-            st.warning("No tables found on this page.")
+        document = parse(fetch_html(url, cache, ready_selector="table.wikitable"), parser)
 
-        headlines = []
-        if scrape_headlines:
-            if selected_headlines_tags:
-                for tag in selected_headlines_tags:
-                    headline_tags = soup.find_all(tag)
-                    headlines += [tag.text.strip() for tag in headline_tags]
+        tables = TableExtractor(table_class="wikitable", on_table=lambda i: st.write(f"Scraping Table {i}..."))
+        headlines = HeadlineExtractor(selected_headlines_tags if scrape_headlines else [])
+        links = LinkExtractor(url)
+        extractors = [tables, headlines]
+        if scrape_links:
+            extractors.append(links)
+        run_extractors(document, extractors)
+
+        if not tables.found:
+            st.warning("No tables found on this page.")
 
-        links = []
-        if
+        return tables.result(), headlines.result(), links.result(), None
 
     except Exception as e:
         return None, None, None, f"Error occurred: {str(e)}"
 
 def start_scraping(url, scrape_headlines, selected_headlines_tags, scrape_links):
-    table_data, headlines, links, error = scrape_wikipedia_data(url, scrape_headlines, selected_headlines_tags, scrape_links)
-    
+    trace = Trace(url)
+    with tracing(trace), span("scrape", url=url):
+        result = scrape_wikipedia_data(url, scrape_headlines, selected_headlines_tags, scrape_links, FetchCache())
+    trace.close()
+    # The session keeps only a handle; the result lives in the shared store.
+    if 'scraped' in st.session_state:
+        get_result_store().discard(st.session_state['scraped'])
+    st.session_state['scraped'] = get_result_store().put(dict(zip(RESULT_PARTS, result)))
+    st.session_state['trace'] = trace
+
+def show_results(table_data, headlines, links, error):
     if error:
         st.error(error)
     else:
@@ -87,35 +71,18 @@ def start_scraping(url, scrape_headlines, selected_headlines_tags, scrape_links)
 
         for i, df in enumerate(table_data, 1):
             st.write(f"Table {i}:")
-            st.write(df)
-            csv = df.to_csv(index=False)
-            st.download_button(
-                label=f"Download Table {i} CSV",
-                data=csv,
-                file_name=f"table_{i}.csv",
-                mime="text/csv",
-            )
+            show_frame(df, f"table_{i}")
+            download_frame(f"Table {i}", df, f"table_{i}", "CSV")
 
         if headlines:
             st.write("Headlines Found:")
-            for headline in headlines:
-                st.write(f"- {headline}")
+            show_frame(list_frame(headlines, "Headlines"), "headlines")
 
         if links:
             st.write("Links Found:")
-            for link in links:
-                st.write(f"- {link}")
-
-            links_df = pd.DataFrame(links, columns=["Links"])
-            
-            csv_links = links_df.to_csv(index=False)
-             
-            st.download_button(
-                label="Download Links CSV", 
-                data=csv_links,
-                file_name="scraped_links.csv",
-                mime="text/csv",
-            )
+            links_df = list_frame(links, "Links")
+            show_frame(links_df, "links")
+            download_frame("Links", links_df, "scraped_links", "CSV")
 
 st.title("Data Scraper - SAASTRA TECH 2025")
 st.write("Table, Headline, and Link Scraper")
@@ -129,5 +96,20 @@ selected_headlines_tags = st.multiselect("Select headlines to scrape:", headline
 
 scrape_links = st.checkbox("Scrape Links")
 
+show_performance = st.sidebar.toggle("Performance panel", help="Time and bytes per stage of the last scrape.")
+
 if st.button("Start Scraping"):
     start_scraping(url, scrape_headlines, selected_headlines_tags, scrape_links)
+
+rendering = Trace("render")
+if 'scraped' in st.session_state:
+    result = get_result_store().get(st.session_state['scraped'])
+    if result is None:
+        st.warning("These results are no longer kept; scrape the page again.")
+    else:
+        with tracing(rendering), span("render.results"):
+            show_results(*[result[part] for part in RESULT_PARTS])
+
+if show_performance and 'trace' in st.session_state:
+    show_trace(st.session_state['trace'], "Scrape timings")
+    show_trace(rendering, "Rendering timings")
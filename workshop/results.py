@@ -0,0 +1,217 @@
+import atexit
+import os
+import pickle
+import shutil
+import sys
+import tempfile
+import threading
+import uuid
+from collections import OrderedDict
+import pandas as pd
+
+# Memory for scrape results across all sessions; least recently used results
+# beyond it are written to disk, and dropped once the disk budget is used up.
+MAX_RESULT_BYTES = int(os.environ.get("SCRAPER_RESULT_MB", 512)) * 1024 * 1024
+MAX_SPILL_BYTES = int(os.environ.get("SCRAPER_RESULT_SPILL_MB", 2048)) * 1024 * 1024
+# Defaults to a temporary directory removed at exit.
+SPILL_DIR = os.environ.get("SCRAPER_RESULT_SPILL_DIR")
+# Text columns with at most this share of distinct values become categoricals.
+CATEGORY_RATIO = 0.5
+
+
+def compact_column(series):
+    """Return series in the smallest dtype that holds the same values."""
+    kind = series.dtype.kind
+    if kind in "iu":
+        return pd.to_numeric(series, downcast="integer" if kind == "i" else "unsigned")
+    if kind == "f":
+        smaller = series.astype("float32")
+        if ((smaller.astype(series.dtype) == series) | series.isna()).all():
+            return smaller
+        return series
+    if series.dtype != object or pd.api.types.infer_dtype(series, skipna=True) != "string":
+        return series
+    if series.nunique() <= len(series) * CATEGORY_RATIO:
+        return series.astype("category")
+    return series.astype("string[pyarrow]")
+
+
+def compact_frame(df):
+    """Return df with downcast numbers and categorical or Arrow-backed text columns."""
+    out = df.copy(deep=False)
+    # By position: scraped tables can repeat a column name.
+    for position in range(df.shape[1]):
+        out.isetitem(position, compact_column(df.iloc[:, position]))
+    return out
+
+
+def compact_strings(values):
+    """Return a list of scraped strings with repeats sharing one interned object."""
+    return [sys.intern(value) if type(value) is str else value for value in values]
+
+
+def compact(value):
+    """Compact a scraped value: a table, a list of tables or a list of strings."""
+    if isinstance(value, pd.DataFrame):
+        return compact_frame(value)
+    if isinstance(value, list) and value and isinstance(value[0], pd.DataFrame):
+        return [compact_frame(df) for df in value]
+    if isinstance(value, list):
+        return compact_strings(value)
+    return value
+
+
+def size_of(value):
+    """Estimate the memory held by a compacted value."""
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(deep=True).sum())
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(size_of(item) for item in value)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(size_of(item) for item in value.values())
+    if hasattr(value, "nbytes"):
+        return int(value.nbytes)
+    return sys.getsizeof(value)
+
+
+class ResultStore:
+    """Process-wide store of scrape results, addressed by handle.
+
+    Sessions keep only the handle. Results are stored compacted, and once
+    they take more than max_bytes the least recently used ones are pickled
+    to spill_dir and read back when asked for again. Spilled results beyond
+    max_spill_bytes are dropped; get() then returns None.
+    """
+
+    def __init__(self, max_bytes=MAX_RESULT_BYTES, spill_dir=SPILL_DIR, max_spill_bytes=MAX_SPILL_BYTES):
+        self.max_bytes = max_bytes
+        self.max_spill_bytes = max_spill_bytes
+        self.spill_dir = spill_dir
+        self.memory_bytes = 0
+        self.spilled_bytes = 0
+        # handle -> [parts or None when spilled, size in memory or on disk]
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def put(self, parts):
+        """Store a dict of named result parts, compacted, and return its handle."""
+        parts = {name: compact(value) for name, value in parts.items()}
+        handle = uuid.uuid4().hex[:12]
+        with self._lock:
+            self._add(handle, parts)
+        return handle
+
+    def get(self, handle):
+        """Return the parts stored under handle, or None once they were dropped."""
+        with self._lock:
+            entry = self._entries.get(handle)
+            if entry is None:
+                return None
+            self._entries.move_to_end(handle)
+            if entry[0] is not None:
+                return entry[0]
+            path = self._path(handle)
+            try:
+                with open(path, "rb") as f:
+                    parts = pickle.load(f)
+            except OSError:
+                del self._entries[handle]
+                self.spilled_bytes -= entry[1]
+                return None
+            os.remove(path)
+            del self._entries[handle]
+            self.spilled_bytes -= entry[1]
+            self._add(handle, parts)
+            return parts
+
+    def discard(self, handle):
+        with self._lock:
+            entry = self._entries.pop(handle, None)
+            if entry is None:
+                return
+            if entry[0] is not None:
+                self.memory_bytes -= entry[1]
+            else:
+                self.spilled_bytes -= entry[1]
+                try:
+                    os.remove(self._path(handle))
+                except OSError:
+                    pass
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _add(self, handle, parts):
+        size = size_of(parts)
+        self._entries[handle] = [parts, size]
+        self.memory_bytes += size
+        # The newest result stays in memory even when it alone is over budget.
+        for old in list(self._entries):
+            if self.memory_bytes <= self.max_bytes:
+                break
+            if old != handle and self._entries[old][0] is not None:
+                self._spill(old)
+        for old in list(self._entries):
+            if self.spilled_bytes <= self.max_spill_bytes:
+                break
+            if self._entries[old][0] is None:
+                self.spilled_bytes -= self._entries.pop(old)[1]
+                os.remove(self._path(old))
+
+    def _spill(self, handle):
+        entry = self._entries[handle]
+        if self.max_spill_bytes <= 0:
+            del self._entries[handle]
+            self.memory_bytes -= entry[1]
+            return
+        path = self._path(handle)
+        # Written under a temporary name, so a failed pickle leaves neither a
+        # partial file nor a changed entry behind; the result then stays in memory.
+        partial = path + ".partial"
+        try:
+            with open(partial, "wb") as f:
+                pickle.dump(entry[0], f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(partial, path)
+        except Exception:
+            try:
+                os.remove(partial)
+            except OSError:
+                pass
+            return
+        self.memory_bytes -= entry[1]
+        entry[0], entry[1] = None, os.path.getsize(path)
+        self.spilled_bytes += entry[1]
+
+    def _path(self, handle):
+        if self.spill_dir is None:
+            self.spill_dir = tempfile.mkdtemp(prefix="scrape-results-")
+            atexit.register(shutil.rmtree, self.spill_dir, True)
+        else:
+            os.makedirs(self.spill_dir, exist_ok=True)
+        return os.path.join(self.spill_dir, handle + ".pickle")
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def configure(max_bytes=None, spill_dir=None, max_spill_bytes=None):
+    """Change the store's budgets; the store is recreated on next use."""
+    global MAX_RESULT_BYTES, SPILL_DIR, MAX_SPILL_BYTES, _store
+    with _store_lock:
+        if max_bytes is not None:
+            MAX_RESULT_BYTES = max_bytes
+        if spill_dir is not None:
+            SPILL_DIR = spill_dir
+        if max_spill_bytes is not None:
+            MAX_SPILL_BYTES = max_spill_bytes
+        _store = None
+
+
+def get_result_store():
+    """Return the result store shared by all sessions."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = ResultStore(MAX_RESULT_BYTES, SPILL_DIR, MAX_SPILL_BYTES)
+        return _store
@@ -0,0 +1,274 @@
+from concurrent.futures import Future
+from crawler import crawl
+from discovery import discover, schedule
+from fetch import FetchCache, fetch_html, get_politeness
+from parsers import parse
+from extract import TableExtractor, HeadlineExtractor, LinkExtractor, SourceExtractor, MetadataExtractor, run_extractors
+from snapshots import IncrementalScrape, get_snapshot_store
+from linkgraph import LinkGraph
+from parse_pool import ParsedPage, frame_from_ipc, get_parse_pool
+from tracing import carry, current_span_id, current_trace, span
+from urls import resolve
+
+
+def get_all_links(url, cache=None, parser=None, mode="auto"):
+    """Get all links from the given URL."""
+    document = scrape_page(url, cache, parser, mode)
+    return extract_links(document, url)
+
+
+def extract_links(document, url):
+    """Get all links from an already parsed page."""
+    links = set()
+    for a_tag in document.iter_elements({"a"}):
+        href = a_tag.get('href')
+        if href is None:
+            continue
+        link = resolve(url, href)
+        if link is not None:
+            links.add(link)
+    return links
+
+
+def scrape_page(url, cache=None, parser=None, mode="auto"):
+    """Scrape the content of the given URL."""
+    with span("scrape_page", url=url):
+        document = parse(fetch_html(url, cache, mode), parser)
+    return document
+
+
+def scrape_data(job, url, scrape_headlines, selected_headlines_tags, scrape_links, scrape_images, scrape_media, table_indices, cache=None, parser=None, mode="auto", incremental=None, graph=None, pool=None):
+    """Scrape one page into (tables, headlines, links, images, media files, metadata, error).
+
+    With a ParsePool the page is parsed in a worker process.
+    """
+    with span("scrape_data", url=url):
+        try:
+            html = fetch_html(url, cache, mode)
+        except Exception as e:
+            return None, None, None, None, None, None, f"Error occurred: {str(e)}"
+        job.advance("pages")
+        job.check_cancelled()
+        if incremental and incremental.page_unchanged(url, html):
+            job.log(f"{url} has not changed since the last scrape; skipped.")
+            job.advance("unchanged_pages")
+            return [], [], [], [], [], None, None
+        if pool is not None:
+            options = (selected_headlines_tags if scrape_headlines else [], scrape_links, scrape_images, scrape_media, table_indices)
+            parsed, _ = parse_in_pool(pool, html, url, parser, options, incremental).result()
+            result = parsed_data(job, parsed, url, incremental)
+        else:
+            document = parse(html, parser)
+            if incremental:
+                incremental.set_links(url, extract_links(document, url))
+            result = extract_data(job, document, scrape_headlines, selected_headlines_tags, scrape_links, scrape_images, scrape_media, table_indices, url, incremental)
+        if job.progress.get("pages_without_tables"):
+            job.warn("No tables found on this page.")
+        if graph is not None:
+            graph.add_links(url, result[2])
+        return result
+
+
+def no_tables(job, url):
+    """Note a page without tables; callers warn once for all of them."""
+    job.log(f"No tables found on {url or 'this page'}.")
+    job.advance("pages_without_tables")
+
+
+def extract_data(job, document, scrape_headlines, selected_headlines_tags, scrape_links, scrape_images, scrape_media, table_indices, url=None, incremental=None):
+    """Run the selected extractors over a parsed page in a single pass."""
+    def on_table(i):
+        job.log(f"Scraping Table {i}...")
+        job.advance("tables")
+
+    keep = incremental.table_filter(url) if incremental else None
+    tables = TableExtractor(table_indices, on_table=on_table, keep=keep)
+    metadata = MetadataExtractor()
+    headlines = HeadlineExtractor(selected_headlines_tags if scrape_headlines else [])
+    links = LinkExtractor(url)
+    images = SourceExtractor(["img"], url)
+    media_files = SourceExtractor(["audio", "video", "source"], url)
+
+    extractors = [tables, metadata, headlines]
+    if scrape_links:
+        extractors.append(links)
+    if scrape_images:
+        extractors.append(images)
+    if scrape_media:
+        extractors.append(media_files)
+    run_extractors(document, extractors)
+
+    if not tables.found:
+        no_tables(job, url)
+
+    table_data = tables.result()
+    if incremental:
+        # Emit only the row-level changes of the tables that changed.
+        table_data = incremental.diff_tables(url, tables.positions, table_data)
+        incremental.commit_page(url)
+        job.advance("unchanged_tables", tables.skipped)
+
+    return table_data, headlines.result(), links.result(), images.result(), media_files.result(), metadata.result(), None
+
+
+def parse_in_pool(pool, html, url, parser, options, incremental=None):
+    """Hand a page to the parse pool and return a Future of its (ParsedPage, links).
+
+    options are parse_page's extraction arguments. Blocks while the pool
+    is full, which holds back the fetching thread.
+    """
+    previous_tables = incremental.previous_table_hashes(url) if incremental else None
+    trace, parent_id = current_trace(), current_span_id()
+    with span("parse_pool.submit", bytes=len(html)):
+        submitted = pool.submit(html, url, parser, *options, previous_tables)
+    result = Future()
+
+    def done(future):
+        try:
+            parsed = future.result()
+        except BaseException as e:
+            result.set_exception(e)
+            return
+        if trace is not None:
+            trace.adopt(parsed.spans, parent_id)
+        if incremental:
+            incremental.set_links(url, parsed.links)
+        result.set_result((parsed, parsed.links))
+
+    submitted.add_done_callback(done)
+    return result
+
+
+def parsed_data(job, parsed, url=None, incremental=None):
+    """Turn a ParsedPage from the parse pool into the same result as extract_data()."""
+    for position in parsed.positions:
+        job.log(f"Scraping Table {position}...")
+    job.advance("tables", len(parsed.positions))
+    if not parsed.found:
+        no_tables(job, url)
+
+    table_data = [frame_from_ipc(data) for data in parsed.tables]
+    if incremental:
+        incremental.set_table_hashes(url, parsed.table_hashes)
+        table_data = incremental.diff_tables(url, parsed.positions, table_data)
+        incremental.commit_page(url)
+        job.advance("unchanged_tables", parsed.skipped)
+
+    return table_data, parsed.headlines, parsed.page_links, parsed.images, parsed.media_files, parsed.metadata, None
+
+
+def fetch_page_and_links(url, cache=None, parser=None, mode="auto", incremental=None, pool=None, options=()):
+    """Fetch a page once and return its parsed document along with its outbound links.
+
+    In incremental mode an unchanged page is not parsed at all; its document
+    is None and the links come from the snapshot. With a ParsePool a Future
+    of the pair is returned instead, whose document is a ParsedPage already
+    run through the extractors in options.
+    """
+    html = fetch_html(url, cache, mode)
+    if incremental and incremental.page_unchanged(url, html):
+        return None, incremental.previous_links(url)
+    if pool is not None:
+        return parse_in_pool(pool, html, url, parser, options, incremental)
+    document = parse(html, parser)
+    links = extract_links(document, url)
+    if incremental:
+        incremental.set_links(url, links)
+    return document, links
+
+
+def crawl_data(job, url, scrape_headlines, selected_headlines_tags, scrape_links, scrape_images, scrape_media, table_indices, max_depth, max_pages, cache=None, parser=None, mode="auto", incremental=None, graph=None, pool=None, seeds=None, on_page=None):
+    """Crawl from the given URL and merge the data scraped from every page.
+
+    With a ParsePool pages are parsed and extracted in worker processes as
+    they arrive, instead of one after another on this thread. seeds, when
+    given, are crawled instead of url; on_page(page_url) is called for
+    every page scraped without an error.
+    """
+    all_table_data, headlines, links, images, media_files = [], [], [], [], []
+    metadata = None
+    scraped = 0
+    job.progress["max_pages"] = max_pages
+    options = (selected_headlines_tags if scrape_headlines else [], scrape_links, scrape_images, scrape_media, table_indices)
+
+    def fetch_page(page_url):
+        with span("page", url=page_url):
+            return fetch_page_and_links(page_url, cache, parser, mode, incremental, pool, options)
+
+    pages = crawl(seeds if seeds is not None else url, carry(fetch_page), max_depth=max_depth, max_pages=max_pages, ready_at=get_politeness().ready_at)
+    # The crawler yields pages under their canonical URL.
+    start_url = resolve(None, url) or url
+    for page_url, depth, document, error in pages:
+        job.advance("pages")
+        if error:
+            if page_url == start_url:
+                return None, None, None, None, None, None, error
+            job.warn(f"{page_url}: {error}")
+            continue
+        if job.cancelled:
+            job.warn("Crawl cancelled; showing the pages scraped so far.")
+            break
+        if on_page is not None:
+            on_page(page_url)
+        if document is None:
+            job.log(f"{page_url} has not changed since the last scrape; skipped.")
+            job.advance("unchanged_pages")
+            continue
+        job.log(f"Scraping {page_url} (depth {depth})...")
+        if isinstance(document, ParsedPage):
+            page_result = parsed_data(job, document, page_url, incremental)
+        else:
+            page_result = extract_data(
+                job, document, scrape_headlines, selected_headlines_tags, scrape_links, scrape_images, scrape_media, table_indices, page_url, incremental
+            )
+        page_tables, page_headlines, page_links, page_images, page_media, page_metadata, _ = page_result
+        scraped += 1
+        if graph is not None:
+            graph.add_links(page_url, page_links)
+        all_table_data += page_tables
+        headlines += page_headlines
+        links += page_links
+        images += page_images
+        media_files += page_media
+        if page_url == start_url:
+            metadata = page_metadata
+    without_tables = job.progress.get("pages_without_tables", 0)
+    if without_tables:
+        job.warn(f"{without_tables} of {scraped} scraped pages had no tables.")
+    return all_table_data, headlines, links, images, media_files, metadata, None
+
+
+def discover_data(job, url, scrape_headlines, selected_headlines_tags, scrape_links, scrape_images, scrape_media, table_indices, max_pages, cache=None, parser=None, mode="auto", incremental=None, graph=None, pool=None):
+    """Scrape the pages a site lists in its sitemaps and feeds that are new or changed since they were last scraped.
+
+    Listings are compared by lastmod against the snapshot store, which
+    records the lastmod of every page scraped this way.
+    """
+    store = get_snapshot_store()
+    with span("discover", url=url) as attributes:
+        listed = discover(url, job.log)
+        pages, unchanged = schedule(listed, store.lastmods(listed), max_pages)
+        attributes["listed"] = len(listed)
+        attributes["scheduled"] = len(pages)
+    if not listed:
+        return None, None, None, None, None, None, "Error occurred: no sitemap or feed listing any pages was found."
+    job.log(f"Found {len(listed)} page(s) in sitemaps and feeds: {len(pages)} new or changed, {unchanged} unchanged since the last scrape.")
+    lastmods = dict(pages)
+    return crawl_data(
+        job, url, scrape_headlines, selected_headlines_tags, scrape_links, scrape_images, scrape_media, table_indices, 0, len(pages),
+        cache, parser, mode, incremental, graph, pool, seeds=list(lastmods), on_page=lambda page_url: store.save_lastmod(page_url, lastmods[page_url]),
+    )
+
+
+def run_scrape(job, url, scrape_headlines, selected_headlines_tags, scrape_links, scrape_images, scrape_media, table_indices, crawl_pages, max_depth, max_pages, parser, mode, incremental, discover_pages=False):
+    """Scrape, crawl or scrape a site's listed pages on a background worker; the result is kept on the job."""
+    cache = FetchCache()
+    incremental = IncrementalScrape(get_snapshot_store()) if incremental else None
+    graph = job.artifacts["link_graph"] = LinkGraph()
+    pool = get_parse_pool()
+    with span("scrape", url=url, crawl=crawl_pages, discover=discover_pages, mode=mode, parser=parser, parse_workers=pool.workers if pool else 0):
+        if discover_pages:
+            return discover_data(job, url, scrape_headlines, selected_headlines_tags, scrape_links, scrape_images, scrape_media, table_indices, max_pages, cache, parser, mode, incremental, graph, pool)
+        if crawl_pages:
+            return crawl_data(job, url, scrape_headlines, selected_headlines_tags, scrape_links, scrape_images, scrape_media, table_indices, max_depth, max_pages, cache, parser, mode, incremental, graph, pool)
+        return scrape_data(job, url, scrape_headlines, selected_headlines_tags, scrape_links, scrape_images, scrape_media, table_indices, cache, parser, mode, incremental, graph, pool)
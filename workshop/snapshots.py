@@ -0,0 +1,271 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+import numpy as np
+import pandas as pd
+from tracing import span
+
+SNAPSHOT_PATH = os.environ.get(
+    "SCRAPER_SNAPSHOT_PATH", os.path.join(os.path.expanduser("~"), ".cache", "workshop-scraper", "snapshots.sqlite")
+)
+
+
+def content_hash(text):
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def _pack(value):
+    return zlib.compress(json.dumps(value).encode("utf-8"), 1)
+
+
+def _unpack(blob):
+    return json.loads(zlib.decompress(blob).decode("utf-8"))
+
+
+class SnapshotStore:
+    """SQLite store of the last scrape of each URL: page hash, outbound links and per-table rows.
+
+    Pages found in sitemaps and feeds also keep the lastmod they were listed
+    with when they were last scraped.
+    """
+
+    def __init__(self, path=SNAPSHOT_PATH):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS pages (
+                url TEXT PRIMARY KEY,
+                page_hash TEXT NOT NULL,
+                links BLOB,
+                scraped_at REAL NOT NULL
+            )"""
+        )
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS page_tables (
+                url TEXT NOT NULL,
+                position INTEGER NOT NULL,
+                table_hash TEXT NOT NULL,
+                data BLOB NOT NULL,
+                PRIMARY KEY (url, position)
+            )"""
+        )
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS discovered (
+                url TEXT PRIMARY KEY,
+                lastmod REAL,
+                scraped_at REAL NOT NULL
+            )"""
+        )
+        self._conn.commit()
+
+    def page(self, url):
+        """Return (page_hash, links) of the last scrape of url, or None."""
+        with self._lock:
+            row = self._conn.execute("SELECT page_hash, links FROM pages WHERE url = ?", (url,)).fetchone()
+        if row is None:
+            return None
+        return row[0], _unpack(row[1]) if row[1] else []
+
+    def save_page(self, url, page_hash, links):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?)", (url, page_hash, _pack(sorted(links)), time.time())
+            )
+            self._conn.commit()
+
+    def table_hashes(self, url):
+        """Return {position: table_hash} for the tables of the last scrape of url."""
+        with self._lock:
+            rows = self._conn.execute("SELECT position, table_hash FROM page_tables WHERE url = ?", (url,)).fetchall()
+        return dict(rows)
+
+    def load_table(self, url, position):
+        """Return the stored rows of a table as an all-string DataFrame, or None."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT data FROM page_tables WHERE url = ? AND position = ?", (url, position)
+            ).fetchone()
+        if row is None:
+            return None
+        data = _unpack(row[0])
+        return pd.DataFrame(data["rows"], columns=data["columns"], dtype=object)
+
+    def save_table(self, url, position, table_hash, df):
+        data = {"columns": [str(column) for column in df.columns], "rows": table_text(df).values.tolist()}
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO page_tables VALUES (?, ?, ?, ?)", (url, position, table_hash, _pack(data))
+            )
+            self._conn.commit()
+
+    def lastmods(self, urls):
+        """Return {url: lastmod} for the given URLs that were scraped after discovery; lastmod may be None."""
+        urls = list(urls)
+        found = {}
+        with self._lock:
+            # SQLite limits the number of parameters per statement.
+            for start in range(0, len(urls), 500):
+                chunk = urls[start:start + 500]
+                found.update(self._conn.execute(
+                    f"SELECT url, lastmod FROM discovered WHERE url IN ({','.join('?' * len(chunk))})", chunk
+                ).fetchall())
+        return found
+
+    def save_lastmod(self, url, lastmod):
+        with self._lock:
+            self._conn.execute("INSERT OR REPLACE INTO discovered VALUES (?, ?, ?)", (url, lastmod, time.time()))
+            self._conn.commit()
+
+
+def table_text(df):
+    """Return df as the strings snapshots store and compare.
+
+    Whole numbers are written without a decimal point, so an integer column
+    that turns float because one cell became a placeholder still matches
+    the rows stored before.
+    """
+    text = df.astype(str)
+    for position in range(df.shape[1]):
+        series = df.iloc[:, position]
+        if series.dtype.kind != "f":
+            continue
+        # Within float64's exact integer range.
+        whole = (series.abs() < 2 ** 53) & (series == series.round())
+        if whole.any():
+            text.iloc[whole.to_numpy(), position] = series[whole].astype("int64").astype(str).to_numpy()
+    return text
+
+
+def _row_hashes(df):
+    return pd.util.hash_pandas_object(df, index=False).to_numpy()
+
+
+def diff_rows(old, new):
+    """Return the rows added, changed and removed between two versions of a table.
+
+    Rows are matched on the first column when it is a unique key in both
+    versions; otherwise whole rows are compared, which reports edits as a
+    removal plus an addition. Values are compared in their table_text()
+    form, as stored in the snapshot. The result has a leading column named
+    "change", or "_change" (and so on) when the table has a "change" column
+    of its own.
+    """
+    new_text = table_text(new)
+    new_text.columns = [str(column) for column in new.columns]
+    if old is None or list(old.columns) != list(new_text.columns):
+        added = np.ones(len(new), dtype=bool)
+        changed = np.zeros(len(new), dtype=bool)
+        removed = np.ones(0 if old is None else len(old), dtype=bool)
+    else:
+        old_hashes, new_hashes = _row_hashes(old), _row_hashes(new_text)
+        key = new_text.columns[0] if len(new_text.columns) else None
+        if key is not None and old[key].is_unique and new_text[key].is_unique:
+            matches = pd.Index(old[key]).get_indexer(new_text[key])
+            added = matches == -1
+            changed = ~added & (old_hashes[matches.clip(0)] != new_hashes)
+            removed = ~old[key].isin(new_text[key]).to_numpy()
+        else:
+            added = ~np.isin(new_hashes, old_hashes)
+            changed = np.zeros(len(new), dtype=bool)
+            removed = ~np.isin(old_hashes, new_hashes)
+
+    change = "change"
+    while change in new_text.columns or (old is not None and change in old.columns):
+        change = "_" + change
+    parts = [new[added].assign(**{change: "added"}), new[changed].assign(**{change: "changed"})]
+    if old is not None and removed.any():
+        removed_rows = old[removed]
+        if list(old.columns) == list(new_text.columns):
+            removed_rows = removed_rows.set_axis(new.columns, axis=1)
+        parts.append(removed_rows.assign(**{change: "removed"}))
+    diff = pd.concat(parts, ignore_index=True)
+    # By position: scraped tables can repeat a column name.
+    return diff.iloc[:, [-1] + list(range(diff.shape[1] - 1))]
+
+
+def changed_tables(previous, hashes):
+    """Return a TableExtractor keep() callback that skips tables whose hash matches previous[position].
+
+    The hash of every table it sees is stored in hashes by position.
+    """
+    def keep(position, element):
+        table_hash = content_hash(element.get_text())
+        hashes[position] = table_hash
+        return previous.get(position) != table_hash
+
+    return keep
+
+
+class IncrementalScrape:
+    """Per-run bookkeeping for incremental scrapes against a SnapshotStore."""
+
+    def __init__(self, store):
+        self.store = store
+        self._pages = {}
+        self._tables = {}
+        self._lock = threading.Lock()
+
+    def page_unchanged(self, url, html):
+        """Record the page hash and tell whether it matches the last scrape."""
+        page_hash = content_hash(html)
+        previous = self.store.page(url)
+        with self._lock:
+            self._pages[url] = [page_hash, []]
+        return previous is not None and previous[0] == page_hash
+
+    def previous_links(self, url):
+        previous = self.store.page(url)
+        return previous[1] if previous else []
+
+    def set_links(self, url, links):
+        with self._lock:
+            self._pages[url][1] = list(links)
+
+    def table_filter(self, url):
+        """Return a TableExtractor keep() callback that only accepts changed tables."""
+        return changed_tables(self.store.table_hashes(url), self._tables.setdefault(url, {}))
+
+    def previous_table_hashes(self, url):
+        return self.store.table_hashes(url)
+
+    def set_table_hashes(self, url, hashes):
+        """Record table hashes computed elsewhere, e.g. by a parser process."""
+        with self._lock:
+            self._tables.setdefault(url, {}).update(hashes)
+
+    def diff_tables(self, url, positions, frames):
+        """Diff freshly built tables against their snapshots and store the new versions."""
+        diffs = []
+        hashes = self._tables.get(url, {})
+        with span("diff", tables=len(frames)):
+            for position, df in zip(positions, frames):
+                diffs.append(diff_rows(self.store.load_table(url, position), df))
+                self.store.save_table(url, position, hashes[position], df)
+        return diffs
+
+    def commit_page(self, url):
+        """Store the page hash once its tables have been processed."""
+        with self._lock:
+            page_hash, links = self._pages[url]
+        self.store.save_page(url, page_hash, links)
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_snapshot_store():
+    """Return the process-wide snapshot store."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = SnapshotStore()
+        return _store
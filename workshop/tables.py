@@ -0,0 +1,167 @@
+import re
+from itertools import chain
+import pandas as pd
+from parsers import table_rows, row_count
+
+# ASCII digits only: pandas cannot parse e.g. Arabic-Indic or fullwidth ones.
+NUMBER_RE = re.compile(r"^[+-]?(?:\d{1,3}(?:,\d{3})+|\d+)(?:\.\d+)?$", re.ASCII)
+DATE_RE = re.compile(r"^(?:\d{4}-\d{1,2}-\d{1,2}|\d{1,2} [A-Z][a-z]+ \d{4}|[A-Z][a-z]+ \d{1,2}, \d{4})$", re.ASCII)
+# Trailing reference marks such as "1,234[a][5]".
+FOOTNOTE_RE = re.compile(r"(?:\[[^\]]*\])+$")
+# Cells that only mark a missing value; they do not block dtype inference.
+PLACEHOLDERS = frozenset(["", "-", "–", "—", "−", "?", "N/A", "n/a", "NA"])
+
+MAX_COLSPAN = 1000
+MAX_ROWSPAN = 65534
+
+
+def _span(value, limit):
+    if not value or value == "1":
+        return 1
+    try:
+        return max(1, min(int(value), limit))
+    except ValueError:
+        return 1
+
+
+def _fill_pending(values, pending):
+    while len(values) in pending:
+        column = len(values)
+        text, rows_left = pending[column]
+        values.append(text)
+        if rows_left == 1:
+            del pending[column]
+        else:
+            pending[column] = (text, rows_left - 1)
+
+
+def expand_row(cells, pending):
+    """Return the texts of a row of cell tuples laid out on the column grid.
+
+    Cells spanning several columns are repeated in each of them. Cells
+    spanning several rows are recorded in pending, a {column: (text,
+    rows_left)} dict carried from row to row, and filled into the columns
+    they cover on the following rows.
+    """
+    values = []
+    for _, text, colspan, rowspan in cells:
+        if colspan is None and rowspan is None and not pending:
+            values.append(text)
+            continue
+        colspan = _span(colspan, MAX_COLSPAN)
+        rowspan = _span(rowspan, MAX_ROWSPAN)
+        for _ in range(colspan):
+            _fill_pending(values, pending)
+            if rowspan > 1:
+                pending[len(values)] = (text, rowspan - 1)
+            values.append(text)
+    _fill_pending(values, pending)
+    while pending and max(pending) > len(values):
+        values.append("")
+        _fill_pending(values, pending)
+    return values
+
+
+def _has_spans(cells):
+    return any(_span(colspan, MAX_COLSPAN) > 1 or _span(rowspan, MAX_ROWSPAN) > 1 for _, _, colspan, rowspan in cells)
+
+
+def _unique(headers):
+    seen = {}
+    unique = []
+    for header in headers:
+        if header in seen:
+            seen[header] += 1
+            header = f"{header}.{seen[header]}"
+        else:
+            seen[header] = 0
+        unique.append(header)
+    return unique
+
+
+def _convert(values, numeric, date, filled):
+    """Turn a column of strings into a numeric or datetime Series when every filled cell allows it."""
+    series = pd.Series(values, dtype=object)
+    if not filled:
+        return series
+    present = series.where(~series.isin(PLACEHOLDERS))
+    if numeric:
+        cleaned = present.str.replace(FOOTNOTE_RE, "", regex=True).str.replace(",", "", regex=False)
+        try:
+            return pd.to_numeric(cleaned)
+        except (TypeError, ValueError):
+            # A cell the pattern let through but pandas cannot read; keep the text.
+            return series
+    if date:
+        parsed = pd.to_datetime(present, format="mixed", errors="coerce")
+        if parsed.notna().sum() == filled:
+            return parsed
+    return series
+
+
+def table_to_frame(table):
+    """Convert a table element to a DataFrame.
+
+    The first row is the header when it contains th cells; further all-th
+    rows directly below a spanning header are merged into the column names.
+    rowspan/colspan are laid out on a column grid and rows are streamed
+    straight into one preallocated list per column. Columns whose cells are
+    all numbers or all dates come back as numeric/datetime dtypes.
+    """
+    rows = table_rows(table)
+    first_cells = next(rows, None)
+    if first_cells is None:
+        return None
+    n_rows = row_count(table) - 1
+
+    pending = {}
+    if any(name == "th" for name, _, _, _ in first_cells):
+        headers = expand_row(first_cells, pending)
+        if _has_spans(first_cells):
+            for cells in rows:
+                if not cells or any(name != "th" for name, _, _, _ in cells):
+                    rows = chain([cells], rows)
+                    break
+                sub_headers = expand_row(cells, pending)
+                headers = [
+                    parent if j >= len(sub_headers) or sub_headers[j] == parent else f"{parent} {sub_headers[j]}".strip()
+                    for j, parent in enumerate(headers)
+                ]
+                n_rows -= 1
+    else:
+        headers = [f"Column {j+1}" for j in range(len(expand_row(first_cells, {})))]
+        rows = chain([first_cells], rows)
+        n_rows += 1
+
+    width = len(headers)
+    columns = [[""] * n_rows for _ in range(width)]
+    numeric = [True] * width
+    date = [True] * width
+    filled = [0] * width
+
+    i = 0
+    for cells in rows:
+        if i == n_rows:
+            for column in columns:
+                column.append("")
+            n_rows += 1
+        values = expand_row(cells, pending)
+        for j in range(min(width, len(values))):
+            text = values[j]
+            columns[j][i] = text
+            if text in PLACEHOLDERS:
+                continue
+            filled[j] += 1
+            if numeric[j]:
+                if "[" in text:
+                    text = FOOTNOTE_RE.sub("", text)
+                numeric[j] = NUMBER_RE.match(text) is not None
+            if date[j] and not numeric[j]:
+                date[j] = DATE_RE.match(text) is not None
+        i += 1
+
+    if i < n_rows:
+        columns = [column[:i] for column in columns]
+    headers = _unique(headers)
+    data = {headers[j]: _convert(columns[j], numeric[j], date[j], filled[j]) for j in range(width)}
+    return pd.DataFrame(data, index=pd.RangeIndex(i))
@@ -0,0 +1,15 @@
+import pytest
+from crawler import crawl
+
+
+@pytest.mark.parametrize("seed", ["https://example.com", "HTTPS://Example.com/?utm_source=feed", "https://example.com:443/"])
+def test_start_url_is_fetched_once_under_its_canonical_form(seed):
+    fetched = []
+
+    def fetch_page(url):
+        fetched.append(url)
+        return url, ["https://example.com/", "https://example.com/a", "https://other.example/"]
+
+    pages = [url for url, _, _, _ in crawl(seed, fetch_page, max_depth=1)]
+    assert pages == ["https://example.com/", "https://example.com/a"]
+    assert fetched == pages
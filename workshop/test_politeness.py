@@ -0,0 +1,29 @@
+import pytest
+from politeness import Politeness
+
+
+def robots_answering(status):
+    calls = []
+
+    def fetch_robots(url):
+        calls.append(url)
+        return status, "User-agent: *\nDisallow: /private\n"
+
+    return fetch_robots, calls
+
+
+@pytest.mark.parametrize("status", [500, 503, 429])
+def test_robots_server_error_disallows_until_asked_again(status):
+    fetch_robots, calls = robots_answering(status)
+    politeness = Politeness(fetch_robots, robots_error_ttl=0)
+    assert not politeness.allowed("https://example.com/page")
+    assert not politeness.allowed("https://example.com/page")
+    assert len(calls) == 2
+
+
+def test_missing_robots_allows_everything():
+    fetch_robots, calls = robots_answering(404)
+    politeness = Politeness(fetch_robots)
+    assert politeness.allowed("https://example.com/private")
+    assert politeness.allowed("https://example.com/page")
+    assert len(calls) == 1
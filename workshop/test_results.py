@@ -0,0 +1,55 @@
+import functools
+import threading
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+from jobs import Job
+from results import ResultStore
+from scraper import run_scrape
+
+RESULT_PARTS = ["table_data", "headlines", "links", "images", "media_files", "metadata", "error"]
+
+
+@pytest.fixture
+def site(tmp_path):
+    for i in range(3):
+        rows = "".join(f"<tr><td>row {i}-{j}</td><td>{j}</td></tr>" for j in range(200))
+        links = "".join(f'<a href="/p{k}.html">page {k}</a>' for k in range(3))
+        (tmp_path / f"p{i}.html").write_text(
+            f"<html><body><h1>Page {i}</h1>{links}<table><tr><th>Name</th><th>Value</th></tr>{rows}</table></body></html>"
+        )
+    handler = functools.partial(SimpleHTTPRequestHandler, directory=str(tmp_path))
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+
+
+def scrape(url):
+    """Return the parts of a crawl as App.store_scrape stores them, link graph included."""
+    job = Job()
+    parts = dict(zip(RESULT_PARTS, run_scrape(job, url, True, ["h1"], True, False, False, [], True, 1, 3, None, "static", False)))
+    parts["link_graph"] = job.artifacts.pop("link_graph", None)
+    return parts
+
+
+def test_results_over_budget_are_spilled_and_read_back(site, tmp_path):
+    store = ResultStore(max_bytes=1, spill_dir=str(tmp_path / "spill"), max_spill_bytes=1 << 30)
+    first = store.put(scrape(site + "/p0.html"))
+    second = store.put(scrape(site + "/p1.html"))
+    assert store.spilled_bytes > 0
+    parts = store.get(first)
+    assert parts["error"] is None
+    assert len(parts["link_graph"]) > 0
+    parts["link_graph"].add_links(site + "/p0.html", [site + "/p9.html"])
+    assert store.get(second) is not None
+    assert not list((tmp_path / "spill").glob("*.partial"))
+
+
+def test_result_that_cannot_be_pickled_stays_in_memory(tmp_path):
+    store = ResultStore(max_bytes=1, spill_dir=str(tmp_path), max_spill_bytes=1 << 30)
+    first = store.put({"lock": threading.Lock()})
+    memory_bytes = store.memory_bytes
+    second = store.put({"headlines": ["a"]})
+    assert store.get(first) is not None and store.get(second) is not None
+    assert store.memory_bytes >= memory_bytes
+    assert not list(tmp_path.iterdir())
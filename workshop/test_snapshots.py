@@ -0,0 +1,25 @@
+from parsers import parse
+from snapshots import SnapshotStore, diff_rows
+from tables import table_to_frame
+
+
+def frame(header, rows):
+    html = "<table><tr>" + "".join(f"<th>{name}</th>" for name in header) + "</tr>"
+    html += "".join("<tr>" + "".join(f"<td>{cell}</td>" for cell in row) + "</tr>" for row in rows) + "</table>"
+    return table_to_frame(next(parse(html).iter_elements(["table"])))
+
+
+def test_placeholder_in_number_column_changes_only_its_row(tmp_path):
+    store = SnapshotStore(str(tmp_path / "snapshots.sqlite"))
+    store.save_table("https://example.com/", 0, "hash", frame(["Country", "Pop"], [["A", "1000"], ["B", "2000"], ["C", "3000"]]))
+    new = frame(["Country", "Pop"], [["A", "1000"], ["B", "—"], ["C", "3000"]])
+    diff = diff_rows(store.load_table("https://example.com/", 0), new)
+    assert diff["change"].tolist() == ["changed"]
+    assert diff["Country"].tolist() == ["B"]
+
+
+def test_scraped_change_column_is_kept():
+    new = frame(["Country", "change"], [["A", "+1"], ["B", "-2"]])
+    diff = diff_rows(None, new)
+    assert diff.columns.tolist() == ["_change", "Country", "change"]
+    assert diff["change"].tolist() == [1, -2]
@@ -0,0 +1,89 @@
+import re
+import unicodedata
+from collections import Counter
+
+# Distinct terms a counter keeps; beyond it the rarer half is dropped.
+MAX_TERMS = 200000
+TOP_TERMS = 30
+# Terms collected before they are added to the counts in one go.
+BATCH_TERMS = 50000
+
+WORD = re.compile(r"[^\W_]+(?:'[^\W_]+)*")
+STOPWORDS = frozenset("""
+    a about after against all also an and any are as at be been before being between both but by can could did do does
+    during each for from had has have he her here hers him his how i if in into is it its just may me more most my new no
+    nor not of off on once only or other our out over own said same says she should so some such than that the their them
+    then there these they this those through to too under until up us very was we were what when where which while who
+    whom why will with would you your
+""".split())
+
+
+def words(text):
+    """Return the words of text, Unicode-normalized and case-folded."""
+    if not text.isascii():
+        text = unicodedata.normalize("NFKC", text).replace("’", "'")
+    return WORD.findall(text.casefold())
+
+
+def terms(text, n=1, stopwords=STOPWORDS):
+    """Return the n-word terms of text; terms that start or end with a stopword are skipped."""
+    tokens = words(text)
+    if n == 1:
+        return [token for token in tokens if token not in stopwords]
+    grams = zip(*(tokens[i:] for i in range(n)))
+    return [" ".join(gram) for gram in grams if gram[0] not in stopwords and gram[-1] not in stopwords]
+
+
+class TermCounter:
+    """Streaming counts of words or n-grams over any number of texts.
+
+    Texts are counted one at a time, so headlines from many pages and many
+    scrapes can be fed in as they come, and counters can be merged. Memory
+    is bounded by max_terms: past it the rarest terms are dropped, which
+    leaves the counts of frequent terms exact but may undercount terms that
+    were dropped and seen again (pruned is then set).
+    """
+
+    def __init__(self, n=1, stopwords=STOPWORDS, max_terms=MAX_TERMS):
+        self.n = n
+        self.stopwords = stopwords
+        self.max_terms = max_terms
+        self.counts = Counter()
+        self.texts = 0
+        self.pruned = False
+
+    def update(self, texts):
+        """Count the terms of each text; values that are not strings are skipped."""
+        batch = []
+        for text in texts:
+            if not isinstance(text, str):
+                continue
+            batch += terms(text, self.n, self.stopwords)
+            self.texts += 1
+            if len(batch) >= BATCH_TERMS:
+                self._add(batch)
+                batch = []
+        self._add(batch)
+        return self
+
+    def merge(self, other):
+        """Add the counts of another counter over the same kind of terms."""
+        self.counts.update(other.counts)
+        self.texts += other.texts
+        self.pruned = self.pruned or other.pruned
+        if len(self.counts) > self.max_terms:
+            self._prune()
+        return self
+
+    def top(self, k=TOP_TERMS):
+        """Return the k most frequent terms with their counts."""
+        return self.counts.most_common(k)
+
+    def _add(self, batch):
+        self.counts.update(batch)
+        if len(self.counts) > self.max_terms:
+            self._prune()
+
+    def _prune(self):
+        self.counts = Counter(dict(self.counts.most_common(self.max_terms // 2)))
+        self.pruned = True
@@ -0,0 +1,32 @@
+import pandas as pd
+import streamlit as st
+
+
+def trace_frame(trace):
+    """Return a trace's per-stage summary as a DataFrame."""
+    return pd.DataFrame(trace.summary(), columns=["stage", "calls", "total s", "self s", "bytes"])
+
+
+def show_trace(trace, title):
+    """Show in the sidebar where a trace's time went, per stage, with its spans for download."""
+    with st.sidebar.expander(title, expanded=True):
+        spans = list(trace.spans)
+        if not spans:
+            st.caption("Nothing recorded yet.")
+            return
+        wall = (max(s["end_time_unix_nano"] for s in spans) - min(s["start_time_unix_nano"] for s in spans)) / 1e9
+        dropped = f", {trace.dropped} more not kept" if trace.dropped else ""
+        st.caption(f"{wall:.2f} s wall time, {len(spans)} spans{dropped}. Self time excludes child stages; concurrent stages add up to more than the wall time.")
+        df = trace_frame(trace)
+        st.bar_chart(df.set_index("stage")["self s"], horizontal=True)
+        st.dataframe(df, hide_index=True)
+        key = f"trace_{trace.id}_{len(spans)}"
+        if st.session_state.get(key) or st.button("Prepare spans (JSON lines)", key=f"prepare_{key}"):
+            st.session_state[key] = True
+            st.download_button(
+                label="Download spans (JSON lines)",
+                data=trace.to_jsonl(),
+                file_name=f"trace_{trace.id}.jsonl",
+                mime="application/x-ndjson",
+                key=f"download_{key}",
+            )
@@ -0,0 +1,191 @@
+"""Timing and byte-count spans for the scrape pipeline.
+
+    python tracing.py traces.jsonl [more.jsonl ...]
+
+prints the time and bytes per stage summed over every trace in the logs.
+"""
+import contextvars
+import json
+import os
+import sys
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+# Finished traces are appended here as JSON lines, one span per line.
+TRACE_LOG = os.environ.get("SCRAPER_TRACE_LOG")
+# Spans kept per trace; a crawl of thousands of pages drops the rest and counts them.
+MAX_SPANS = 20000
+
+_current = contextvars.ContextVar("trace", default=(None, None))
+
+
+class Trace:
+    """The spans recorded for one scrape, in the order they finished.
+
+    Spans are dicts with OpenTelemetry-style fields: trace_id, span_id,
+    parent_span_id, name, start_time_unix_nano, end_time_unix_nano and
+    attributes. A "bytes" attribute is the size of the data the stage
+    handled, counted in characters for decoded text.
+    """
+
+    def __init__(self, name=""):
+        self.id = uuid.uuid4().hex
+        self.name = name
+        self.spans = []
+        self.dropped = 0
+        self.closed = False
+        self._lock = threading.Lock()
+
+    def add(self, record):
+        with self._lock:
+            if len(self.spans) < MAX_SPANS:
+                self.spans.append(record)
+            else:
+                self.dropped += 1
+
+    def adopt(self, records, parent_id=None):
+        """Add spans recorded elsewhere, e.g. in a parser process, below parent_id."""
+        known = {record["span_id"] for record in records}
+        for record in records:
+            record = dict(record, trace_id=self.id)
+            if record["parent_span_id"] not in known:
+                record["parent_span_id"] = parent_id
+            self.add(record)
+
+    def close(self, log_path=None):
+        """Mark the trace finished and append it to log_path or TRACE_LOG, when set."""
+        self.closed = True
+        log_path = log_path or TRACE_LOG
+        if log_path:
+            text = self.to_jsonl()
+            with open(log_path, "a", encoding="utf-8") as f:
+                f.write(text)
+
+    def to_jsonl(self):
+        with self._lock:
+            return "".join(json.dumps(record, default=str) + "\n" for record in self.spans)
+
+    def summary(self):
+        """Return (name, calls, total seconds, self seconds, bytes) per span name, slowest first."""
+        return summarize(self.spans)
+
+
+def summarize(records):
+    """Aggregate spans by name.
+
+    Self time is a span's duration minus that of its direct children, so it
+    adds up without double counting; spans that ran concurrently still add
+    up to more than the wall time.
+    """
+    children = {}
+    for record in records:
+        duration = record["end_time_unix_nano"] - record["start_time_unix_nano"]
+        key = (record["trace_id"], record["parent_span_id"])
+        children[key] = children.get(key, 0) + duration
+    stages = {}
+    for record in records:
+        duration = record["end_time_unix_nano"] - record["start_time_unix_nano"]
+        own = max(0, duration - children.get((record["trace_id"], record["span_id"]), 0))
+        stage = stages.setdefault(record["name"], [0, 0, 0, 0])
+        stage[0] += 1
+        stage[1] += duration
+        stage[2] += own
+        stage[3] += record["attributes"].get("bytes", 0) or 0
+    rows = [(name, calls, total / 1e9, own / 1e9, size) for name, (calls, total, own, size) in stages.items()]
+    return sorted(rows, key=lambda row: -row[3])
+
+
+def current_trace():
+    return _current.get()[0]
+
+
+@contextmanager
+def tracing(trace):
+    """Record the spans opened on this thread into trace."""
+    token = _current.set((trace, None))
+    try:
+        yield trace
+    finally:
+        _current.reset(token)
+
+
+@contextmanager
+def span(name, **attributes):
+    """Time the block as a span of the current trace; a no-op outside of one.
+
+    Yields the attribute dict, so the block can add e.g. the bytes it read.
+    """
+    trace, parent_id = _current.get()
+    if trace is None:
+        yield attributes
+        return
+    span_id = uuid.uuid4().hex[:16]
+    token = _current.set((trace, span_id))
+    start = time.time_ns()
+    try:
+        yield attributes
+    except BaseException as e:
+        attributes["error"] = type(e).__name__
+        raise
+    finally:
+        end = time.time_ns()
+        _current.reset(token)
+        trace.add({
+            "trace_id": trace.id,
+            "span_id": span_id,
+            "parent_span_id": parent_id,
+            "name": name,
+            "start_time_unix_nano": start,
+            "end_time_unix_nano": end,
+            "thread": threading.current_thread().name,
+            "attributes": attributes,
+        })
+
+
+def current_span_id():
+    return _current.get()[1]
+
+
+def carry(fn):
+    """Wrap fn so that spans it opens on another thread join the caller's trace and span."""
+    state = _current.get()
+    if state[0] is None:
+        return fn
+
+    def run(*args, **kwargs):
+        token = _current.set(state)
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            _current.reset(token)
+
+    return run
+
+
+def load(paths):
+    """Read spans from JSON-lines trace logs."""
+    records = []
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            records.extend(json.loads(line) for line in f if line.strip())
+    return records
+
+
+def main(argv=None):
+    paths = (argv if argv is not None else sys.argv[1:]) or ([TRACE_LOG] if TRACE_LOG else [])
+    if not paths:
+        print(__doc__.strip(), file=sys.stderr)
+        return 2
+    records = load(paths)
+    traces = len({record["trace_id"] for record in records})
+    print(f"{len(records)} spans from {traces} traces")
+    print(f"  {'stage':<20} {'calls':>7} {'total s':>10} {'self s':>10} {'MB':>9}")
+    for name, calls, total, own, size in summarize(records):
+        print(f"  {name:<20} {calls:>7} {total:>10.3f} {own:>10.3f} {size / 1e6:>9.2f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
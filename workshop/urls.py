@@ -0,0 +1,88 @@
+import re
+from functools import lru_cache
+from urllib.parse import urljoin, urlsplit, urlunsplit
+
+DEFAULT_PORTS = {"http": "80", "https": "443"}
+# Query parameters that only track where a click came from.
+TRACKING_PARAMS = frozenset(["gclid", "dclid", "fbclid", "msclkid", "yclid", "igshid", "mc_cid", "mc_eid", "_ga", "_gl"])
+TRACKING_PREFIXES = ("utm_",)
+# Schemes of hrefs that never point to a page.
+SKIPPED_SCHEMES = ("javascript:", "mailto:", "tel:", "data:", "sms:", "ftp:")
+HOST_PATTERN = r"^[A-Za-z][A-Za-z0-9+.-]*://(?:[^@/?#]*@)?(\[[^\]]*\]|[^/:?#]*)"
+HOST_RE = re.compile(HOST_PATTERN)
+
+
+def remove_dot_segments(path):
+    """Resolve "." and ".." path segments as in RFC 3986 section 5.2.4."""
+    if "." not in path:
+        return path
+    output = []
+    segments = path.split("/")
+    for i, segment in enumerate(segments):
+        if segment == ".":
+            if i == len(segments) - 1:
+                output.append("")
+        elif segment == "..":
+            if len(output) > 1:
+                output.pop()
+            if i == len(segments) - 1:
+                output.append("")
+        else:
+            output.append(segment)
+    return "/".join(output)
+
+
+def _is_tracking(param):
+    name = param.split("=", 1)[0].lower()
+    return name in TRACKING_PARAMS or name.startswith(TRACKING_PREFIXES)
+
+
+@lru_cache(maxsize=65536)
+def canonicalize(url):
+    """Return the canonical form of an absolute URL.
+
+    Lowercases the scheme and host, drops default ports, the fragment and
+    tracking parameters, resolves dot segments and gives an empty path "/".
+    """
+    parts = urlsplit(url)
+    scheme = parts.scheme.lower()
+    netloc = parts.netloc
+    try:
+        port = parts.port
+    except ValueError:
+        netloc = netloc.lower()
+    else:
+        host = parts.hostname or ""
+        if ":" in host:
+            host = f"[{host}]"
+        userinfo = netloc.rpartition("@")[0]
+        netloc = (userinfo + "@" if userinfo else "") + host
+        if port is not None and str(port) != DEFAULT_PORTS.get(scheme):
+            netloc += f":{port}"
+    path = remove_dot_segments(parts.path) or "/"
+    query = parts.query
+    if query:
+        query = "&".join(param for param in query.split("&") if param and not _is_tracking(param))
+    return urlunsplit((scheme, netloc, path, query, ""))
+
+
+def resolve(base, href):
+    """Resolve href against the page URL base; returns None for non-http(s) links."""
+    href = href.strip()
+    if not href or href.lower().startswith(SKIPPED_SCHEMES):
+        return None
+    url = urljoin(base, href) if base else href
+    if not url.lower().startswith(("http://", "https://")):
+        return None
+    return canonicalize(url)
+
+
+def host_of(url):
+    """Return the lowercased host of a URL, without user info or port; "" when it has none."""
+    match = HOST_RE.match(url)
+    return match[1].lower() if match else ""
+
+
+def hosts_of(urls):
+    """Return the lowercased host of every URL in a pandas Series, vectorized."""
+    return urls.str.extract(HOST_PATTERN, expand=False).str.lower()
@@ -0,0 +1,68 @@
+import numpy as np
+import streamlit as st
+from cleaning import fingerprint
+from lru import LRUCache
+
+# Rows sent to the browser per rerun.
+PAGE_SIZE = 100
+MAX_CACHED_VIEWS = 32
+
+_views = LRUCache(MAX_CACHED_VIEWS)
+
+
+def filter_rows(df, query):
+    """Return the positions of rows where any cell contains query, ignoring case."""
+    if not query:
+        return np.arange(len(df))
+    mask = np.zeros(len(df), dtype=bool)
+    for column in range(df.shape[1]):
+        series = df.iloc[:, column]
+        mask |= series.astype(str).str.contains(query, case=False, regex=False).to_numpy(dtype=bool)
+    return np.flatnonzero(mask)
+
+
+def sort_rows(df, positions, column, descending=False):
+    """Order row positions by one column, missing values last."""
+    series = df.iloc[positions, column].reset_index(drop=True)
+    try:
+        order = series.sort_values(ascending=not descending, kind="stable", na_position="last").index
+    except TypeError:
+        # Mixed numbers and text in one column.
+        order = series.astype(str).sort_values(ascending=not descending, kind="stable").index
+    return positions[order.to_numpy()]
+
+
+def view_rows(df, query="", sort_column=None, descending=False):
+    """Return the row positions of df after filtering and sorting, cached per table and view."""
+    def compute():
+        positions = filter_rows(df, query)
+        if sort_column is not None:
+            positions = sort_rows(df, positions, sort_column, descending)
+        return positions
+
+    return _views.cached((fingerprint(df), query, sort_column, descending), compute)
+
+
+def show_frame(df, key, page_size=PAGE_SIZE):
+    """Show a DataFrame one page at a time; filtering and sorting happen on the server.
+
+    Tables that fit on one page are shown as they are.
+    """
+    if len(df) <= page_size:
+        st.dataframe(df)
+        return
+
+    filter_column, sort_column, order_column = st.columns([3, 2, 1])
+    query = filter_column.text_input("Filter rows:", key=f"{key}_filter").strip()
+    columns = ["(table order)"] + [str(column) for column in df.columns]
+    sort_by = sort_column.selectbox("Sort by:", range(len(columns)), format_func=columns.__getitem__, key=f"{key}_sort_{len(columns)}")
+    descending = order_column.checkbox("Descending", key=f"{key}_desc")
+
+    positions = view_rows(df, query, sort_by - 1 if sort_by else None, descending)
+    pages = max(1, (len(positions) - 1) // page_size + 1)
+    # The page widget is keyed on the row count so a new filter starts again at page 1.
+    page = st.number_input(f"Page (of {pages}):", min_value=1, max_value=pages, value=1, key=f"{key}_page_{len(positions)}")
+    start = (page - 1) * page_size
+    st.dataframe(df.iloc[positions[start:start + page_size]])
+    matched = f"{len(positions)} matching rows of {len(df)}" if query else f"{len(df)} rows"
+    st.caption(f"Rows {min(start + 1, len(positions))}-{min(start + page_size, len(positions))} of {matched}")